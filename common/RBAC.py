@@ -1,3 +1,6 @@
+import time
+from functools import lru_cache
+
 from common.security import decode_access_token
 from flask import request
 from common.exeptions import SmartRoomExceptions
@@ -6,6 +9,15 @@ from common.exeptions import SmartRoomExceptions
 # Auth & RBAC helpers (mirroring users_service style)
 # ─────────────────────────────────────────────
 
+@lru_cache(maxsize=4096)
+def _decode_access_token_cached(token: str):
+    """
+    Decode a JWT once per distinct token string.
+    Clients resend the same token on every request, so the signature check is memoized.
+    """
+    return decode_access_token(token)
+
+
 def get_current_user_payload():
     """
     Helper to read Authorization header, decode JWT, and return token payload.
@@ -15,7 +27,11 @@ def get_current_user_payload():
         return None
 
     token = auth_header.split(" ", 1)[1]
-    payload = decode_access_token(token)
+    payload = _decode_access_token_cached(token)
+
+    # Cached payloads outlive the token, so re-check expiry on every access
+    if payload and payload.get("exp") is not None and payload["exp"] <= time.time():
+        return None
     return payload
 
 
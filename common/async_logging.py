@@ -0,0 +1,89 @@
+import atexit
+import logging
+import threading
+from collections import deque
+from typing import Iterable
+
+
+class AsyncBatchHandler(logging.Handler):
+    """
+    Log handler that keeps file/stdout writes off the request path.
+
+    Records are appended to a bounded ring buffer and a background thread writes
+    them to the target handlers in batches (one write + flush per target per batch).
+    When the buffer is full the oldest record is dropped, so the request never
+    blocks and the most recent records survive an overload.
+    """
+
+    def __init__(
+        self,
+        targets: Iterable[logging.Handler],
+        max_queue_size: int = 65536,
+        batch_size: int = 256,
+        flush_interval: float = 0.05,
+    ):
+        super().__init__()
+        self.targets = list(targets)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        # deque append/popleft are atomic; maxlen makes append drop the oldest record
+        self._buffer = deque(maxlen=max_queue_size)
+        self._wakeup = threading.Event()
+
+        self._worker = threading.Thread(target=self._drain_forever, name="audit-log-writer", daemon=True)
+        self._worker.start()
+        # Runs before logging.shutdown() closes the target streams
+        atexit.register(self.flush)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # Merge args now; they may be mutated after the request returns
+        record.msg = record.getMessage()
+        record.args = None
+        self._buffer.append(record)
+        if len(self._buffer) >= self.batch_size:
+            # A full batch is ready; don't wait out the flush interval
+            self._wakeup.set()
+
+    def flush(self) -> None:
+        """
+        Write out everything still queued.
+        """
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                return
+            self._write(batch)
+
+    def close(self) -> None:
+        # logging.shutdown() closes handlers newest first, so the targets are still open here
+        self.flush()
+        super().close()
+
+    def _next_batch(self) -> list[logging.LogRecord]:
+        batch = []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._buffer.popleft())
+            except IndexError:
+                break
+        return batch
+
+    def _write(self, batch: list[logging.LogRecord]) -> None:
+        for target in self.targets:
+            records = [r for r in batch if r.levelno >= target.level]
+            if not records:
+                continue
+            target.acquire()
+            try:
+                target.stream.write("".join(target.format(r) + target.terminator for r in records))
+                target.flush()
+            except Exception:
+                target.handleError(records[0])
+            finally:
+                target.release()
+
+    def _drain_forever(self) -> None:
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
@@ -11,6 +11,18 @@ DATABASE_URL = os.getenv(
 )
 
 
+# Connection pool bounds (per worker process)
+DB_POOL_MIN_CONN = int(os.getenv("DB_POOL_MIN_CONN", "2"))
+DB_POOL_MAX_CONN = int(os.getenv("DB_POOL_MAX_CONN", "20"))
+
+
+# scrypt cost for password hashes (N, r, p). Tune so one hash takes ~50-100 ms
+# on the deployment hardware; keep p at 1, the web worker is the concurrency unit.
+PASSWORD_SCRYPT_N = int(os.getenv("PASSWORD_SCRYPT_N", "32768"))
+PASSWORD_SCRYPT_R = int(os.getenv("PASSWORD_SCRYPT_R", "8"))
+PASSWORD_SCRYPT_P = int(os.getenv("PASSWORD_SCRYPT_P", "1"))
+
+
 # Secret key for JWT – in real deployment this should be strong and stored safely
 JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "change_this_in_production")
 
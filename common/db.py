@@ -0,0 +1,107 @@
+import atexit
+import re
+import threading
+from contextlib import contextmanager
+from itertools import count
+
+import psycopg2.extensions
+from psycopg2.pool import ThreadedConnectionPool
+from common.config import DATABASE_URL, DB_POOL_MIN_CONN, DB_POOL_MAX_CONN
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# Statements run through execute_prepared get a server-side name, one per distinct SQL text
+_statement_names = {}
+_statement_counter = count(1)
+# %% is psycopg2's escaped literal %; %s is a parameter
+_PLACEHOLDER_RE = re.compile(r"%%|%s")
+
+
+class _PreparingConnection(psycopg2.extensions.connection):
+    """
+    Connection that remembers which statements it has already prepared.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared_statements = set()
+
+
+def _get_pool():
+    """
+    Return the process-wide connection pool, creating it on first use
+    (lazily, so each forked worker builds its own).
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadedConnectionPool(
+                    DB_POOL_MIN_CONN,
+                    DB_POOL_MAX_CONN,
+                    DATABASE_URL,
+                    connection_factory=_PreparingConnection,
+                )
+                # Log out of Postgres cleanly instead of leaving idle sessions behind
+                atexit.register(_pool.closeall)
+    return _pool
+
+
+@contextmanager
+def pooled_connection(autocommit=False):
+    """
+    Borrow a pooled connection for one unit of work.
+    Commits on success, rolls back on error, and always hands the connection back
+    (discarding it if it was closed, e.g. after the server dropped it).
+    autocommit=True is for single-statement reads: psycopg2 sends BEGIN and COMMIT
+    as separate round trips, which autocommit skips.
+    """
+    pool = _get_pool()
+    conn = pool.getconn()
+    try:
+        if autocommit:
+            conn.autocommit = True
+        with conn:
+            yield conn
+    finally:
+        if autocommit and not conn.closed:
+            conn.autocommit = False
+        pool.putconn(conn, close=bool(conn.closed))
+
+
+def _numbered_placeholders(query):
+    """
+    Rewrite a psycopg2 query for PREPARE: %s placeholders become $1, $2, ...
+    and %% becomes a literal %.
+    """
+    numbers = count(1)
+    return _PLACEHOLDER_RE.sub(
+        lambda match: "%" if match.group() == "%%" else f"${next(numbers)}",
+        query,
+    )
+
+
+def execute_prepared(cur, query, params):
+    """
+    Run query through a server-side prepared statement, PREPAREing it first if this
+    connection has not seen it yet. query uses %s placeholders and %% for a literal %.
+    Prepared statements outlive transactions, so each pooled connection parses and
+    plans a statement only once.
+    """
+    name = _statement_names.get(query)
+    if name is None:
+        # setdefault keeps the first name if two threads race on a new query
+        name = _statement_names.setdefault(query, f"stmt_{next(_statement_counter)}")
+
+    conn = cur.connection
+    if name not in conn.prepared_statements:
+        # No params, so psycopg2 sends the rewritten SQL as-is
+        sql = _numbered_placeholders(query.strip().rstrip(";"))
+        cur.execute(f"PREPARE {name} AS {sql};")
+        conn.prepared_statements.add(name)
+
+    if params:
+        placeholders = ", ".join(["%s"] * len(params))
+        cur.execute(f"EXECUTE {name} ({placeholders});", params)
+    else:
+        cur.execute(f"EXECUTE {name};")
@@ -1,34 +1,93 @@
 import os
+import re
+import threading
+from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import Mapping
 
+import requests
 from dotenv import load_dotenv
-from sendgrid import SendGridAPIClient
+from python_http_client.exceptions import HTTPError, err_dict
+from sendgrid import __version__ as SENDGRID_VERSION
 from sendgrid.helpers.mail import Mail
 
 BASE_DIR = Path(__file__).resolve().parent
 load_dotenv(dotenv_path=BASE_DIR.parent / ".env")
 TEMPLATE_DIR = BASE_DIR / "email_templates"
+_PLACEHOLDER_RE = re.compile(r"\{\{(\w+)\}\}")
+
+SENDGRID_SEND_URL = "https://api.sendgrid.com/v3/mail/send"
+SENDGRID_TIMEOUT_SECONDS = 10
+
+# SendGridAPIClient opens a fresh urllib connection (TCP + TLS) per send; a Session
+# keeps the connection alive across the emails of a batch. requests.Session is not
+# thread-safe and sends run on the services' email executors, so one per thread.
+_sendgrid_local = threading.local()
+
+_WEEKDAY_NAMES = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+_MONTH_NAMES = (
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December",
+)
 
 
 class EmailConfigurationError(RuntimeError):
     """Raised when required email configuration is missing."""
 
 
-def _render_template(template_name: str, context: Mapping[str, str] | None = None) -> str:
+def _sendgrid_session() -> requests.Session:
+    """
+    Return this thread's SendGrid session, creating it on first use.
+    Carries the same default headers SendGridAPIClient sends.
+    """
+    session = getattr(_sendgrid_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        session.headers.update({
+            "User-Agent": f"sendgrid/{SENDGRID_VERSION};python",
+            "Accept": "application/json",
+        })
+        _sendgrid_local.session = session
+    return session
+
+
+def format_email_datetime(value: datetime) -> str:
+    """
+    Format a datetime for email templates, e.g. "Monday, January 05, 2026 at 03:30 PM".
+    Same output as strftime("%A, %B %d, %Y at %I:%M %p") under the C locale, built
+    from precomputed names instead of re-parsing the format for every booking.
+    """
+    hour = value.hour % 12 or 12
+    meridiem = "PM" if value.hour >= 12 else "AM"
+    return (
+        f"{_WEEKDAY_NAMES[value.weekday()]}, {_MONTH_NAMES[value.month - 1]} "
+        f"{value.day:02d}, {value.year} at {hour:02d}:{value.minute:02d} {meridiem}"
+    )
+
+
+@lru_cache(maxsize=None)
+def _load_template(template_name: str) -> tuple[str, ...]:
+    """
+    Read a template once and split it around its {{key}} placeholders.
+    Even indices hold literal HTML, odd indices hold placeholder names.
+    """
     template_path = TEMPLATE_DIR / template_name
     if not template_path.exists():
         raise FileNotFoundError(f"Email template '{template_name}' not found at {template_path}.")
 
     html = template_path.read_text(encoding="utf-8")
-    if not context:
-        return html
+    return tuple(_PLACEHOLDER_RE.split(html))
 
-    rendered = html
-    for key, value in context.items():
-        rendered = rendered.replace(f"{{{{{key}}}}}", value)
 
-    return rendered
+def _render_template(template_name: str, context: Mapping[str, str] | None = None) -> str:
+    parts = list(_load_template(template_name))
+    context = context or {}
+    for i in range(1, len(parts), 2):
+        key = parts[i]
+        # Placeholders without a context value are left in place
+        parts[i] = context[key] if key in context else f"{{{{{key}}}}}"
+    return "".join(parts)
 
 
 def send_templated_email(
@@ -57,12 +116,16 @@ def send_templated_email(
         html_content=html_content,
     )
 
-    sg = SendGridAPIClient(api_key)
-    response = sg.send(message)
-
-    status_code = getattr(response, "status_code", None)
-    message_id = None
-    if hasattr(response, "headers"):
-        message_id = response.headers.get("X-Message-Id")
+    response = _sendgrid_session().post(
+        SENDGRID_SEND_URL,
+        json=message.get(),
+        headers={"Authorization": f"Bearer {api_key}"},
+        timeout=SENDGRID_TIMEOUT_SECONDS,
+    )
+    # Same contract as SendGridAPIClient.send(): error statuses raise the
+    # python_http_client exception for that code (UnauthorizedError, ...)
+    if response.status_code >= 400:
+        error_class = err_dict.get(response.status_code, HTTPError)
+        raise error_class(response.status_code, response.reason, response.content, response.headers)
 
-    return status_code, message_id
+    return response.status_code, response.headers.get("X-Message-Id")
@@ -4,14 +4,25 @@ from typing import Optional, Dict, Any
 import jwt
 from werkzeug.security import generate_password_hash, check_password_hash
 
-from common.config import JWT_SECRET_KEY, JWT_EXP_MINUTES
+from common.config import (
+    JWT_SECRET_KEY,
+    JWT_EXP_MINUTES,
+    PASSWORD_SCRYPT_N,
+    PASSWORD_SCRYPT_R,
+    PASSWORD_SCRYPT_P,
+)
+
+
+# Werkzeug method string, stored as the prefix of every hash.
+# Retune via PASSWORD_SCRYPT_*; existing hashes are upgraded on the user's next login.
+PASSWORD_HASH_METHOD = f"scrypt:{PASSWORD_SCRYPT_N}:{PASSWORD_SCRYPT_R}:{PASSWORD_SCRYPT_P}"
 
 
 def hash_password(plain_password: str) -> str:
     """
-    Hash a raw password using a strong algorithm (PBKDF2 via Werkzeug).
+    Hash a raw password using a strong algorithm (scrypt via Werkzeug).
     """
-    return generate_password_hash(plain_password)
+    return generate_password_hash(plain_password, method=PASSWORD_HASH_METHOD)
 
 
 def verify_password(plain_password: str, password_hash: str) -> bool:
@@ -21,6 +32,13 @@ def verify_password(plain_password: str, password_hash: str) -> bool:
     return check_password_hash(password_hash, plain_password)
 
 
+def password_needs_rehash(password_hash: str) -> bool:
+    """
+    True if the stored hash was made with a method/cost other than PASSWORD_HASH_METHOD.
+    """
+    return password_hash.split("$", 1)[0] != PASSWORD_HASH_METHOD
+
+
 def create_access_token(user_id: int, role: str) -> str:
     """
     Create a JWT access token that encodes the user id and role.
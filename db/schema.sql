@@ -150,7 +150,6 @@ CREATE TABLE IF NOT EXISTS reports (
 -- INDEXES FOR PERFORMANCE
 -- =====================================================
 -- Rooms: help filters by capacity/location
-CREATE INDEX IF NOT EXISTS idx_rooms_room_name ON rooms (room_name);
 CREATE INDEX IF NOT EXISTS idx_rooms_capacity ON rooms (capacity);
 CREATE INDEX IF NOT EXISTS idx_rooms_location ON rooms (location);
 
@@ -1,7 +1,6 @@
 import logging
 import sys
 import time
-import uuid
 import os
 from datetime import datetime
 from flask import Flask, request, jsonify, g
@@ -30,9 +29,11 @@ from common.RBAC import (
     is_auditor,
 )
 from common.config import API_VERSION
-from common.email_service import send_templated_email, EmailConfigurationError
+from common.email_service import send_templated_email, format_email_datetime, EmailConfigurationError
+from common.json_provider import OrjsonProvider
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 
 # ─────────────────────────────────────────
 # Logging configuration (stdout for Docker)
@@ -59,8 +60,9 @@ def handle_smart_room_exception(e):
 
 @app.before_request
 def start_audit_logging():
-    g.request_id = str(uuid.uuid4())
-    g.start_time = time.time()
+    # Opaque correlation token: 128 random bits, without building a UUID object
+    g.request_id = os.urandom(16).hex()
+    g.start_ns = time.monotonic_ns()
     app.logger.info(
         "REQUEST",
         extra={
@@ -74,14 +76,15 @@ def start_audit_logging():
 
 @app.after_request
 def end_audit_logging(response):
-    duration = time.time() - g.get("start_time", time.time())
+    # Monotonic clock: an NTP step mid-request cannot skew or negate the duration
+    duration_ms = (time.monotonic_ns() - g.get("start_ns", time.monotonic_ns())) // 1_000_000
     app.logger.info(
         "RESPONSE",
         extra={
             "request_id": g.get("request_id"),
             "status_code": response.status_code,
             "path": request.path,
-            "duration_ms": int(duration * 1000),
+            "duration_ms": duration_ms,
         },
     )
     response.headers["X-Request-ID"] = g.get("request_id", "")
@@ -213,8 +216,8 @@ def create_booking_endpoint():
                 user_id,
             )
         else:
-            start_display = booking.start_time.strftime("%A, %B %d, %Y at %I:%M %p")
-            end_display = booking.end_time.strftime("%A, %B %d, %Y at %I:%M %p")
+            start_display = format_email_datetime(booking.start_time)
+            end_display = format_email_datetime(booking.end_time)
 
             context = {
                 "first_name": user_contact.get("first_name", ""),
@@ -498,8 +501,8 @@ def update_booking_endpoint(booking_id: int):
             )
         else:
             room_details = fetch_room_details(booking.room_id) or {}
-            start_display = booking.start_time.strftime("%A, %B %d, %Y at %I:%M %p")
-            end_display = booking.end_time.strftime("%A, %B %d, %Y at %I:%M %p")
+            start_display = format_email_datetime(booking.start_time)
+            end_display = format_email_datetime(booking.end_time)
 
             updated_by = "you"
             if current_user_id != booking.user_id:
@@ -599,8 +602,8 @@ def delete_booking_endpoint(booking_id: int):
             )
         else:
             room_details = fetch_room_details(row["room_id"]) or {}
-            start_display = row["start_time"].strftime("%A, %B %d, %Y at %I:%M %p")
-            end_display = row["end_time"].strftime("%A, %B %d, %Y at %I:%M %p")
+            start_display = format_email_datetime(row["start_time"])
+            end_display = format_email_datetime(row["end_time"])
 
             context = {
                 "first_name": user_contact.get("first_name", ""),
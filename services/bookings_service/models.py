@@ -33,19 +33,24 @@ class Booking:
         """
         Create a Booking object from a dictionary.
         """
-        def parse_dt(value):
-            if isinstance(value, str):
-                try:
-                    return datetime.fromisoformat(value)
-                except ValueError:
-                    return None
-            return value
-
         return Booking(
             id=data.get("booking_id"),
             user_id=data["user_id"],
             room_id=data["room_id"],
-            start_time=parse_dt(data["start_time"]),
-            end_time=parse_dt(data["end_time"]),
-            created_at=parse_dt(data["created_at"]),
-        )
\ No newline at end of file
+            start_time=_parse_dt(data["start_time"]),
+            end_time=_parse_dt(data["end_time"]),
+            created_at=_parse_dt(data["created_at"]),
+        )
+
+
+def _parse_dt(value):
+    """
+    Return value as a datetime. Rows from psycopg2 already hold datetime
+    objects and are returned as-is; only strings are parsed.
+    """
+    if not isinstance(value, str):
+        return value
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
\ No newline at end of file
@@ -1,17 +1,16 @@
 import logging
 import sys
 import time
-import uuid
 import os
 from flask import Flask, request, jsonify, g
 from services.reviews_service.db import (
-    init_reviews_table,
+    init_schema,
     create_review,
     fetch_review_by_id,
     update_review,
     delete_review,
     fetch_review_by_room_id,
-    init_reports_table,
+    fetch_review_listing_digest,
     report_review,
     flag_unflag_review,
     fetch_all_reports,
@@ -29,8 +28,15 @@ from common.RBAC import (
 )
 from common.exeptions import *
 from common.config import API_VERSION
+from common.async_logging import AsyncBatchHandler
+from common.json_provider import OrjsonProvider
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
+
+# Route prefixes resolved once at import
+REVIEWS_URL = f"{API_VERSION}/reviews"
+OPS_LOGS_URL = f"{API_VERSION}/ops/logs"
 
 # ─────────────────────────────────────────
 # Logging configuration (stdout for Docker)
@@ -40,14 +46,14 @@ logger.setLevel(logging.INFO)
 handler = logging.StreamHandler(sys.stdout)
 formatter = logging.Formatter("%(asctime)s %(name)s %(levelname)s %(message)s")
 handler.setFormatter(formatter)
-if not logger.handlers:
-    logger.addHandler(handler)
 log_dir = os.path.join(os.path.dirname(__file__), "logs")
 os.makedirs(log_dir, exist_ok=True)
 LOG_FILE_PATH = os.path.join(log_dir, "reviews_service.log")
 file_handler = logging.FileHandler(LOG_FILE_PATH)
 file_handler.setFormatter(formatter)
-logger.addHandler(file_handler)
+# Audit lines are queued on the request path and written in batches by a background thread
+if not logger.handlers:
+    logger.addHandler(AsyncBatchHandler([handler, file_handler]))
 logger.propagate = False
 app.logger = logger
 
@@ -57,8 +63,9 @@ def handle_smart_room_exception(e):
 
 @app.before_request
 def start_audit_logging():
-    g.request_id = str(uuid.uuid4())
-    g.start_time = time.time()
+    # Opaque correlation token: 128 random bits, without building a UUID object
+    g.request_id = os.urandom(16).hex()
+    g.start_ns = time.monotonic_ns()
     app.logger.info(
         "REQUEST",
         extra={
@@ -72,22 +79,22 @@ def start_audit_logging():
 
 @app.after_request
 def end_audit_logging(response):
-    duration = time.time() - g.get("start_time", time.time())
+    # Monotonic clock: an NTP step mid-request cannot skew or negate the duration
+    duration_ms = (time.monotonic_ns() - g.get("start_ns", time.monotonic_ns())) // 1_000_000
     app.logger.info(
         "RESPONSE",
         extra={
             "request_id": g.get("request_id"),
             "status_code": response.status_code,
             "path": request.path,
-            "duration_ms": int(duration * 1000),
+            "duration_ms": duration_ms,
         },
     )
     response.headers["X-Request-ID"] = g.get("request_id", "")
     return response
 
-# Initialize DB tables once at startup
-init_reviews_table()
-init_reports_table()
+# Initialize DB tables once at startup (skipped when the schema is already current)
+init_schema()
 
 def _tail_log(file_path: str, max_lines: int) -> list[str]:
     """
@@ -104,7 +111,7 @@ def _tail_log(file_path: str, max_lines: int) -> list[str]:
 # 1. SUBMIT A REVIEW
 # ─────────────────────────────────────────────
 
-@app.route(f"{API_VERSION}/reviews", methods=["POST"])
+@app.route(REVIEWS_URL, methods=["POST"])
 def submit_review():
     """
     Submit a review for a meeting room.
@@ -124,7 +131,7 @@ def submit_review():
     
     user_id = int(payload["sub"])
 
-    data = request.get_json() or {}
+    data = request.get_json(silent=True, cache=True) or {}
     room_id = data.get("room_id")
     rating = data.get("rating")
     comment = data.get("comment", "").strip()
@@ -147,7 +154,7 @@ def submit_review():
 # ─────────────────────────────────────────────
 # 2. UPDATE A REVIEW
 # ─────────────────────────────────────────────
-@app.route(f"{API_VERSION}/reviews/update/<int:review_id>", methods=["PUT"])
+@app.route(f"{REVIEWS_URL}/update/<int:review_id>", methods=["PUT"])
 def update_review_details(review_id):
     """
     Update an existing review.
@@ -173,7 +180,7 @@ def update_review_details(review_id):
     if existing_review_data["user_id"] != user_id:
         raise SmartRoomExceptions(403, "Forbidden", "Unauthorized to update this review.")
 
-    data = request.get_json() or {}
+    data = request.get_json(silent=True, cache=True) or {}
     rating = data.get("rating")
     comment = data.get("comment")
 
@@ -193,7 +200,7 @@ def update_review_details(review_id):
 # ─────────────────────────────────────────────
 # 3.DELETE A REVIEW
 # ─────────────────────────────────────────────
-@app.route(f"{API_VERSION}/reviews/<int:review_id>", methods=["DELETE"])
+@app.route(f"{REVIEWS_URL}/<int:review_id>", methods=["DELETE"])
 def delete_review_endpoint(review_id):
     """
     Delete an existing review.
@@ -201,14 +208,10 @@ def delete_review_endpoint(review_id):
     payload, error = require_auth()
     if error:
         raise error
-    if (not is_regular(payload) and existing_review_data["user_id"] != user_id):
-        raise SmartRoomExceptions(403, "Forbidden", "Unauthorized. You can only delete your own reviews.")
     if not (is_admin(payload) or is_moderator(payload)):
         raise SmartRoomExceptions(403, "Forbidden", "Unauthorized to delete this review. Only admins or moderators can delete reviews.")
-    
-    user_id = int(payload["sub"])
 
-    # Fetch existing review to verify ownership
+    # Fetch existing review to make sure it exists
     existing_review_data = fetch_review_by_id(review_id)
     if not existing_review_data:
         raise SmartRoomExceptions(404, "Not Found", "Review not found.")
@@ -221,30 +224,41 @@ def delete_review_endpoint(review_id):
 # ─────────────────────────────────────────────
 # 4. GET REVIEWS FOR A ROOM
 # ─────────────────────────────────────────────
-@app.route(f"{API_VERSION}/reviews/<int:room_id>", methods=["GET"])
+@app.route(f"{REVIEWS_URL}/<int:room_id>", methods=["GET"])
 def reviews_by_room_id(room_id):
     """
     Fetch all reviews for a specific meeting room.
+    Supports If-None-Match: unchanged listings are answered with 304 without loading the rows.
     """
-    
-    reviews_data = fetch_review_by_room_id(room_id)
     payload, error = require_auth()
     if error:
         raise error
     if not read_only(payload) and not is_admin(payload) :
         raise SmartRoomExceptions(403, "Forbidden", "Unauthorized. Read-only roles required.")
+
+    # One aggregate query decides the 304 before any rows are fetched or serialized.
+    # Read before the rows: a write in between only makes the next request a 200.
+    etag = f"{room_id}-{fetch_review_listing_digest(room_id)}"
+    if request.if_none_match.contains(etag):
+        not_modified = app.response_class(status=304)
+        not_modified.set_etag(etag)
+        return not_modified
+
+    reviews_data = fetch_review_by_room_id(room_id)
     # Convert reviews to a list of dictionaries
     reviews = [Review.from_dict(review).to_dict() for review in reviews_data]
 
-    return jsonify({
+    response = jsonify({
         "room_id": room_id,
         "reviews": reviews
-    }), 200
+    })
+    response.set_etag(etag)
+    return response, 200
 
 # ─────────────────────────────────────────────
 # 5. REPORT AN INAPPROPRIATE REVIEW
 # ─────────────────────────────────────────────
-@app.route(f"{API_VERSION}/reviews/report/<int:review_id>", methods=["POST"])
+@app.route(f"{REVIEWS_URL}/report/<int:review_id>", methods=["POST"])
 def report_review_endpoint(review_id):
     """
     Report an inappropriate review.
@@ -254,7 +268,7 @@ def report_review_endpoint(review_id):
         raise error
 
     reporter_user_id = int(payload["sub"])
-    data = request.get_json() or {}
+    data = request.get_json(silent=True, cache=True) or {}
     reason = data.get("reason", "").strip()
 
     if not reason:
@@ -276,7 +290,7 @@ def report_review_endpoint(review_id):
 # ─────────────────────────────────────────────
 # 6. FLAG REVIEW 
 # ─────────────────────────────────────────────
-@app.route(f"{API_VERSION}/reviews/flag/<int:review_id>", methods=["POST"])
+@app.route(f"{REVIEWS_URL}/flag/<int:review_id>", methods=["POST"])
 def flag_review(review_id):
     payload, error = require_auth()
     if error:
@@ -297,7 +311,7 @@ def flag_review(review_id):
 # ─────────────────────────────────────────────
 # 7. UNFLAG REVIEW 
 # ─────────────────────────────────────────────
-@app.route(f"{API_VERSION}/reviews/unflag/<int:review_id>", methods=["POST"])
+@app.route(f"{REVIEWS_URL}/unflag/<int:review_id>", methods=["POST"])
 def unflag_review(review_id):
     payload, error = require_auth()
     if error:
@@ -318,7 +332,7 @@ def unflag_review(review_id):
 # ─────────────────────────────────────────────
 # 8. GET ALL REPORTS 
 # ─────────────────────────────────────────────
-@app.route(f"{API_VERSION}/reviews/reports", methods=["GET"])
+@app.route(f"{REVIEWS_URL}/reports", methods=["GET"])
 def get_all_reports():
     """
     Fetch all reported reviews.
@@ -340,7 +354,7 @@ def get_all_reports():
 # 9b. ADMIN: GET ALL REVIEWS
 # �"?�"?�"?�"?�"?�"?�"?�"?�"?�"?�"?�"?�"?�"?�"?�"?�"?�"?�"?�"?�"?�"?�"?�"?�"?�"?�"?�"?�"?�"?�"?�"?�"?�"?�"?�"?�"?�"?�"?�"?�"?�"?�"?�"?�"?
 
-@app.route(f"{API_VERSION}/reviews", methods=["GET"])
+@app.route(REVIEWS_URL, methods=["GET"])
 def get_all_reviews_endpoint():
     """
     Admin-only endpoint to fetch all non-hidden reviews.
@@ -360,7 +374,7 @@ def get_all_reviews_endpoint():
 # ─────────────────────────────────────────────
 # 9. HIDE/UNHIDE A REVIEW
 # ─────────────────────────────────────────────
-@app.route(f"{API_VERSION}/reviews/hide/<int:review_id>", methods=["PATCH"])
+@app.route(f"{REVIEWS_URL}/hide/<int:review_id>", methods=["PATCH"])
 def hide_review_endpoint(review_id):
     """
     Hide or unhide a review.
@@ -373,27 +387,28 @@ def hide_review_endpoint(review_id):
 
     requester_id = int(payload["sub"])
 
-    review = fetch_review_by_id(review_id)
-    if not review:
-        raise SmartRoomExceptions(404, "Not Found", "Review not found.")
+    # Admins/Moderators can hide/unhide any review; everyone else is rejected before any DB work
+    if not (is_regular(payload) or is_moderator(payload) or is_admin(payload)):
+        raise SmartRoomExceptions(403, "Forbidden", "Unauthorized. Admin or Moderator role required.")
 
     # Get the request data
-    data = request.get_json() or {}
+    data = request.get_json(silent=True, cache=True) or {}
     is_hidden = data.get("is_hidden")
 
     if is_hidden is None:
         raise SmartRoomExceptions(400, "Bad Request", "The 'is_hidden' field is required.")
 
-    # Regular users: can hide only their own review, cannot unhide
-    if is_regular(payload):
-        if review["user_id"] != requester_id:
-            raise SmartRoomExceptions(403, "Forbidden", "You can only hide your own reviews.")
-        if is_hidden is False:
-            raise SmartRoomExceptions(403, "Forbidden", "You cannot unhide a review.")
-    else:
-        # Admins/Moderators can hide/unhide any review
-        if not (is_moderator(payload) or is_admin(payload)):
-            raise SmartRoomExceptions(403, "Forbidden", "Unauthorized. Admin or Moderator role required.")
+    # Regular users: cannot unhide
+    if is_regular(payload) and is_hidden is False:
+        raise SmartRoomExceptions(403, "Forbidden", "You cannot unhide a review.")
+
+    review = fetch_review_by_id(review_id)
+    if not review:
+        raise SmartRoomExceptions(404, "Not Found", "Review not found.")
+
+    # Regular users: can hide only their own review
+    if is_regular(payload) and review["user_id"] != requester_id:
+        raise SmartRoomExceptions(403, "Forbidden", "You can only hide your own reviews.")
 
     # Update the review's hidden status
     updated_review = hide_review(review_id, is_hidden)
@@ -408,7 +423,7 @@ def hide_review_endpoint(review_id):
 # 10. ADMIN: VIEW SERVICE AUDIT LOGS (TAIL)
 # ─────────────────────────────────────────────
 
-@app.route(f"{API_VERSION}/ops/logs", methods=["GET"])
+@app.route(OPS_LOGS_URL, methods=["GET"])
 def get_service_logs():
     """
     Return the last N lines from the service log. Admin only.
@@ -12,29 +12,104 @@ def get_connection():
     """
     return psycopg2.connect(DATABASE_URL)
 
-def init_reviews_table():
-    create_reviews_table_sql = """
-    CREATE TABLE IF NOT EXISTS reviews (
-        review_id SERIAL PRIMARY KEY,
-        room_id INT NOT NULL,
-        user_id INT NOT NULL,
-        rating INT CHECK (rating BETWEEN 1 AND 5), -- Rating between 1 and 5
-        comment TEXT,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        is_flagged BOOLEAN DEFAULT FALSE,
-        is_hidden BOOLEAN DEFAULT FALSE,
-        FOREIGN KEY (room_id) REFERENCES rooms(room_id),
-        FOREIGN KEY (user_id) REFERENCES users(id)
-    );
-
-    CREATE INDEX IF NOT EXISTS idx_reviews_room_id ON reviews (room_id);
+CREATE_REVIEWS_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS reviews (
+    review_id SERIAL PRIMARY KEY,
+    room_id INT NOT NULL,
+    user_id INT NOT NULL,
+    rating INT CHECK (rating BETWEEN 1 AND 5), -- Rating between 1 and 5
+    comment TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    is_flagged BOOLEAN DEFAULT FALSE,
+    is_hidden BOOLEAN DEFAULT FALSE,
+    FOREIGN KEY (room_id) REFERENCES rooms(room_id),
+    FOREIGN KEY (user_id) REFERENCES users(id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_reviews_room_id ON reviews (room_id);
+"""
+
+CREATE_REPORT_REASON_ENUM_SQL = """
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'report_reason_enum') THEN
+        CREATE TYPE report_reason_enum AS ENUM (
+            'Inaccurate Review',
+            'Harassment / Offensive Content',
+            'Misleading Information',
+            'Spam / Promotional Content',
+            'Personal or Private Information',
+            'Unfair Rating',
+            'Not Relevant to the Room'
+        );
+    END IF;
+END $$;
+"""
+
+CREATE_REPORTS_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS reports (
+    report_id SERIAL PRIMARY KEY,
+    review_id INT NOT NULL,
+    reporter_user_id INT NOT NULL,
+    report_reason report_reason_enum NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (review_id) REFERENCES reviews(review_id),
+    FOREIGN KEY (reporter_user_id) REFERENCES users(id)
+);
+"""
+
+# Bump whenever the DDL above changes so running workers re-apply it once
+REVIEWS_SCHEMA_VERSION = "1"
+REVIEWS_SCHEMA_KEY = "reviews_v"
+REVIEWS_SCHEMA_LOCK_ID = 42
+
+
+def init_schema():
+    """
+    Create the reviews and reports tables once for all workers.
+    An advisory lock serializes concurrent workers at startup, and the version stored
+    in schema_meta lets every worker after the first skip the DDL entirely.
     """
+    conn = get_connection()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                # Transaction-scoped: released automatically on commit/rollback
+                cur.execute("SELECT pg_advisory_xact_lock(%s);", (REVIEWS_SCHEMA_LOCK_ID,))
+                cur.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS schema_meta (
+                        key TEXT PRIMARY KEY,
+                        value TEXT NOT NULL
+                    );
+                    """
+                )
+                cur.execute("SELECT value FROM schema_meta WHERE key = %s;", (REVIEWS_SCHEMA_KEY,))
+                row = cur.fetchone()
+                if row and row[0] == REVIEWS_SCHEMA_VERSION:
+                    return
 
+                cur.execute(CREATE_REVIEWS_TABLE_SQL)
+                cur.execute(CREATE_REPORT_REASON_ENUM_SQL)
+                cur.execute(CREATE_REPORTS_TABLE_SQL)
+                cur.execute(
+                    """
+                    INSERT INTO schema_meta (key, value)
+                    VALUES (%s, %s)
+                    ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value;
+                    """,
+                    (REVIEWS_SCHEMA_KEY, REVIEWS_SCHEMA_VERSION),
+                )
+    finally:
+        conn.close()
+
+
+def init_reviews_table():
     conn = get_connection()
     try:
         with conn:
             with conn.cursor() as cur:
-                cur.execute(create_reviews_table_sql)
+                cur.execute(CREATE_REVIEWS_TABLE_SQL)
     finally:
         conn.close()
 
@@ -79,32 +154,38 @@ def fetch_review_by_id(review_id):
     finally:
         conn.close()
 
-def update_review(review_id, rating=None, comment=None):
-    """
-    Update an existing review's rating and/or comment.
-    """
-    fields = []
-    values = []
-    if rating is not None:
-        fields.append("rating = %s")
-        values.append(rating)
-    if comment is not None:
-        fields.append("comment = %s")
-        values.append(comment)
-    values.append(review_id)
-    fields.append("created_at = NOW()")
-    update_sql = f"""
+# One statement per (rating given, comment given) shape; no SQL is built at call time
+_UPDATE_REVIEW_SQLS = {
+    (has_rating, has_comment): f"""
     UPDATE reviews
-    SET {', '.join(fields)}
+    SET {"rating = %s, " if has_rating else ""}{"comment = %s, " if has_comment else ""}created_at = NOW()
     WHERE review_id = %s
     RETURNING review_id, room_id, user_id, rating, comment, created_at;
     """
+    for has_rating in (True, False)
+    for has_comment in (True, False)
+}
+
+
+def update_review(review_id, rating=None, comment=None):
+    """
+    Update an existing review's rating and/or comment.
+    """
+    update_sql = _UPDATE_REVIEW_SQLS[(rating is not None, comment is not None)]
+    if rating is not None and comment is not None:
+        params = (rating, comment, review_id)
+    elif rating is not None:
+        params = (rating, review_id)
+    elif comment is not None:
+        params = (comment, review_id)
+    else:
+        params = (review_id,)
 
     conn = get_connection()
     try:
         with conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                cur.execute(update_sql, tuple(values))
+                cur.execute(update_sql, params)
                 return cur.fetchone()
     finally:
         conn.close()
@@ -135,7 +216,8 @@ def fetch_review_by_room_id(room_id):
     select_sql = """
     SELECT review_id, room_id, user_id, rating, comment, created_at
     FROM reviews
-    WHERE room_id = %s AND is_hidden = FALSE;
+    WHERE room_id = %s AND is_hidden = FALSE
+    ORDER BY review_id;
     """
     conn = get_connection()
     try:
@@ -147,6 +229,34 @@ def fetch_review_by_room_id(room_id):
         conn.close()
 
 
+def fetch_review_listing_digest(room_id):
+    """
+    Fingerprint of what fetch_review_by_room_id(room_id) would return, computed in SQL
+    so an unchanged listing can be answered without fetching any rows.
+    Each visible row is encoded as a JSON array, so edits, replacements and hides
+    all change the digest and no two listings can encode the same way.
+    """
+    select_sql = """
+    SELECT md5(COALESCE(
+        string_agg(
+            json_build_array(review_id, user_id, rating, comment, created_at)::text,
+            ',' ORDER BY review_id
+        ),
+        ''
+    ))
+    FROM reviews
+    WHERE room_id = %s AND is_hidden = FALSE;
+    """
+    conn = get_connection()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute(select_sql, (room_id,))
+                return cur.fetchone()[0]
+    finally:
+        conn.close()
+
+
 def fetch_all_reviews():
     """
     Fetch all non-hidden reviews across all rooms.
@@ -169,43 +279,14 @@ def init_reports_table():
     """
     Initialize the reports table in the database.
     """
-    create_enum_sql = """
-    DO $$
-    BEGIN
-        IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'report_reason_enum') THEN
-            CREATE TYPE report_reason_enum AS ENUM (
-                'Inaccurate Review',
-                'Harassment / Offensive Content',
-                'Misleading Information',
-                'Spam / Promotional Content',
-                'Personal or Private Information',
-                'Unfair Rating',
-                'Not Relevant to the Room'
-            );
-        END IF;
-    END $$;
-    """
-
-    create_reports_table_sql = """
-    CREATE TABLE IF NOT EXISTS reports (
-        report_id SERIAL PRIMARY KEY,
-        review_id INT NOT NULL,
-        reporter_user_id INT NOT NULL,
-        report_reason report_reason_enum NOT NULL,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (review_id) REFERENCES reviews(review_id),
-        FOREIGN KEY (reporter_user_id) REFERENCES users(id)
-    );
-    """
-
     conn = get_connection()
     try:
         with conn:
             with conn.cursor() as cur:
                 # Create the ENUM type if it doesn't exist
-                cur.execute(create_enum_sql)
+                cur.execute(CREATE_REPORT_REASON_ENUM_SQL)
                 # Create the reports table
-                cur.execute(create_reports_table_sql)
+                cur.execute(CREATE_REPORTS_TABLE_SQL)
     finally:
         conn.close()
 
@@ -1,13 +1,19 @@
+from dataclasses import dataclass
 from datetime import datetime
+from typing import Optional
 
+
+@dataclass(slots=True)
 class Review:
-    def __init__(self, review_id: int, room_id: int, user_id: int, rating: int, comment: str, created_at: datetime):
-        self.review_id = review_id
-        self.room_id = room_id
-        self.user_id = user_id
-        self.rating = rating
-        self.comment = comment
-        self.created_at = created_at
+    """
+    Dataclass representing a review entity.
+    """
+    review_id: Optional[int]
+    room_id: int
+    user_id: int
+    rating: int
+    comment: Optional[str]
+    created_at: Optional[datetime]
 
     def to_dict(self) -> dict:
         """
@@ -19,22 +25,19 @@ class Review:
             "user_id": self.user_id,
             "rating": self.rating,
             "comment": self.comment,
-            "created_at": self.created_at.isoformat() if self.created_at else None
+            "created_at": self.created_at
         }
 
     @staticmethod
     def from_dict(data: dict)-> "Review":
         """
         Create a Review object from a dictionary.
-        Handles cases where created_at is already a datetime object or None.
+        created_at is parsed only when it arrives as a string; psycopg2 rows
+        already carry a datetime (or None) and are used as is.
         """
         created_at = data.get("created_at")
-        if isinstance(created_at, str):
+        if type(created_at) is str:
             created_at = datetime.fromisoformat(created_at)
-        elif isinstance(created_at, datetime):
-            created_at = created_at  # Use as is if it's already a datetime object
-        else:
-            created_at = None  # Set to None if it's not a valid datetime or string
 
         return Review(
             review_id=data.get("review_id"),
@@ -43,4 +46,4 @@ class Review:
             rating=data.get("rating"),
             comment=data.get("comment"),
             created_at=created_at
-        )
\ No newline at end of file
+        )
@@ -1,26 +1,32 @@
+import hashlib
 import logging
 import sys
 import time
-import uuid
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import accumulate, chain, count
+from operator import itemgetter
 from flask import Flask, jsonify, request, g
-from datetime import datetime, timedelta
+from datetime import datetime
 from psycopg2.errors import UniqueViolation
 from services.rooms_service.models import Room
-from services.rooms_service.db import (init_rooms_table,
-                                       init_equipment_table,
-                                       init_room_equipment_table,
+from services.rooms_service.db import (init_schema,
                                        fetch_equipment_for_room,
                                        fetch_room,
-                                       fetch_all_rooms,
+                                       fetch_room_with_equipment,
+                                       iter_all_rooms,
                                        create_room,
                                        set_room_equipment,
                                        update_room,
                                        delete_room,
-                                       fetch_bookings_for_room,
-                                       update_room_availability,
+                                       fetch_bookings_for_room_on_date,
+                                       toggle_room_availability_flag,
                                        set_unset_out_of_service,
-                                       fetch_user_contact
+                                       fetch_user_contacts,
+                                       notify_rooms_changed,
+                                       fetch_rooms_generation,
+                                       listen_for_room_changes
                                        )
 from common.RBAC import (
     require_auth,
@@ -33,9 +39,12 @@ from common.RBAC import (
 )
 from common.exeptions import *
 from common.config import API_VERSION
-from common.email_service import send_templated_email, EmailConfigurationError
+from common.email_service import send_templated_email, format_email_datetime, EmailConfigurationError
+from common.async_logging import AsyncBatchHandler
+from common.json_provider import OrjsonProvider
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 
 # ─────────────────────────────────────────
 # Logging configuration (stdout for Docker)
@@ -45,14 +54,14 @@ logger.setLevel(logging.INFO)
 handler = logging.StreamHandler(sys.stdout)
 formatter = logging.Formatter("%(asctime)s %(name)s %(levelname)s %(message)s")
 handler.setFormatter(formatter)
-if not logger.handlers:
-    logger.addHandler(handler)
 log_dir = os.path.join(os.path.dirname(__file__), "logs")
 os.makedirs(log_dir, exist_ok=True)
 LOG_FILE_PATH = os.path.join(log_dir, "rooms_service.log")
 file_handler = logging.FileHandler(LOG_FILE_PATH)
 file_handler.setFormatter(formatter)
-logger.addHandler(file_handler)
+# Requests only enqueue records; a background thread writes stdout + file in batches
+if not logger.handlers:
+    logger.addHandler(AsyncBatchHandler([handler, file_handler]))
 logger.propagate = False
 app.logger = logger
 
@@ -62,8 +71,9 @@ def handle_smart_room_exception(e):
 
 @app.before_request
 def start_audit_logging():
-    g.request_id = str(uuid.uuid4())
-    g.start_time = time.time()
+    # Opaque correlation token: 128 random bits, without building a UUID object
+    g.request_id = os.urandom(16).hex()
+    g.start_ns = time.monotonic_ns()
     app.logger.info(
         "REQUEST",
         extra={
@@ -77,14 +87,15 @@ def start_audit_logging():
 
 @app.after_request
 def end_audit_logging(response):
-    duration = time.time() - g.get("start_time", time.time())
+    # Monotonic clock: an NTP step mid-request cannot skew or negate the duration
+    duration_ms = (time.monotonic_ns() - g.get("start_ns", time.monotonic_ns())) // 1_000_000
     app.logger.info(
         "RESPONSE",
         extra={
             "request_id": g.get("request_id"),
             "status_code": response.status_code,
             "path": request.path,
-            "duration_ms": int(duration * 1000),
+            "duration_ms": duration_ms,
         },
     )
     response.headers["X-Request-ID"] = g.get("request_id", "")
@@ -93,61 +104,199 @@ def end_audit_logging(response):
 # Simple in-memory cache for read-heavy endpoints
 CACHE_TTL_SECONDS = 30
 STATUS_CACHE_TTL_SECONDS = 15
-_rooms_cache_all = {"data": None, "expires_at": None}
+ROOMS_STREAM_BATCH_SIZE = 500
+_rooms_cache_all = {"body": None, "version": None, "expires_at": 0.0}
 _room_cache_by_id = {}
 _room_status_cache = {}
+# Shared rooms generation from the DB (see notify_rooms_changed); cached room bodies
+# from an older version are ignored. Set after init_schema() below.
+_rooms_version = 0
+_rooms_version_lock = threading.Lock()
+# Bumped when every room is invalidated at once; older status entries are ignored
+_status_generation = 0
+_status_generation_counter = count(1)
+def _rooms_etag(version: int) -> str:
+    # Derived from the DB generation only, so every worker gives the same ETag for the same data
+    return f"rooms-{version}"
+
+def _set_validators(response, etag: str, max_age: int, weak: bool = True):
+    """
+    Attach the ETag and a private Cache-Control matching the server-side TTL.
+    """
+    response.set_etag(etag, weak=weak)
+    response.cache_control.private = True
+    response.cache_control.max_age = max_age
+    return response
 
-def _now_utc():
-    return datetime.utcnow()
+def _not_modified(etag: str, max_age: int, weak: bool = True):
+    """
+    Return a 304 response if the client already holds etag, else None.
+    """
+    if not request.if_none_match.contains_weak(etag):
+        return None
+    return _set_validators(app.response_class(status=304), etag, max_age, weak)
 
 def _get_cached_all_rooms():
+    """
+    Return the serialized GET /rooms body, or None if missing, expired or stale.
+    """
     entry = _rooms_cache_all
-    if entry["data"] is not None and entry["expires_at"] and entry["expires_at"] > _now_utc():
-        return entry["data"]
+    if (
+        entry["body"] is not None
+        and entry["version"] == _rooms_version
+        and entry["expires_at"] > time.monotonic()
+    ):
+        return entry["body"]
     return None
 
-def _set_cached_all_rooms(data):
-    _rooms_cache_all["data"] = data
-    _rooms_cache_all["expires_at"] = _now_utc() + timedelta(seconds=CACHE_TTL_SECONDS)
+def _set_cached_all_rooms(body: bytes, version: int):
+    _rooms_cache_all["body"] = body
+    _rooms_cache_all["version"] = version
+    _rooms_cache_all["expires_at"] = time.monotonic() + CACHE_TTL_SECONDS
 
 def _get_cached_room(room_id: int):
+    """
+    Return the serialized GET /rooms/<id> body, or None if missing, expired or stale.
+    """
     entry = _room_cache_by_id.get(room_id)
-    if entry and entry["expires_at"] and entry["expires_at"] > _now_utc():
-        return entry["data"]
+    if (
+        entry
+        and entry["version"] == _rooms_version
+        and entry["expires_at"] > time.monotonic()
+    ):
+        return entry["body"]
     return None
 
-def _set_cached_room(room_id: int, data):
+def _set_cached_room(room_id: int, body: bytes, version: int):
+    # version is read before the DB fetch, so a write racing the fetch leaves a stale entry
     _room_cache_by_id[room_id] = {
-        "data": data,
-        "expires_at": _now_utc() + timedelta(seconds=CACHE_TTL_SECONDS),
+        "body": body,
+        "version": version,
+        "expires_at": time.monotonic() + CACHE_TTL_SECONDS,
     }
 
 def _invalidate_room_cache(room_id: int | None = None):
-    _rooms_cache_all["data"] = None
-    _rooms_cache_all["expires_at"] = None
+    """
+    Drop cached data for room_id (all rooms when None) here and in every other rooms worker.
+    """
+    _drop_local_room_cache(room_id, notify_rooms_changed(room_id))
+
+def _drop_local_room_cache(room_id: int | None, generation: int):
+    global _rooms_version, _status_generation
+    with _rooms_version_lock:
+        # Our own notifications echo back, and they can arrive out of order: never go backwards
+        _rooms_version = max(_rooms_version, generation)
+    _rooms_cache_all["body"] = None
+    _rooms_cache_all["expires_at"] = 0.0
     if room_id is None:
-        _room_cache_by_id.clear()
-        _room_status_cache.clear()
+        # O(1) instead of clearing the dicts under concurrent readers:
+        # the new version/generation makes every existing entry stale
+        _status_generation = next(_status_generation_counter)
     else:
         _room_cache_by_id.pop(room_id, None)
         _room_status_cache.pop(room_id, None)
 
 def _get_cached_room_status(room_id: int):
+    """
+    Return (body, etag, max_age) for the cached status of room_id, or None if missing or expired.
+    """
     entry = _room_status_cache.get(room_id)
-    if entry and entry["expires_at"] and entry["expires_at"] > _now_utc():
-        return entry["data"]
+    if (
+        entry
+        and entry["generation"] == _status_generation
+        and entry["expires_at"] > time.monotonic()
+    ):
+        return entry["body"], entry["etag"], entry["max_age"]
     return None
 
-def _set_cached_room_status(room_id: int, data):
+def _set_cached_room_status(room_id: int, body: bytes, etag: str, max_age: int, generation: int):
+    # generation is read before the DB fetch, like the version for _set_cached_room
     _room_status_cache[room_id] = {
-        "data": data,
-        "expires_at": _now_utc() + timedelta(seconds=STATUS_CACHE_TTL_SECONDS),
+        "body": body,
+        "etag": etag,
+        "max_age": max_age,
+        "generation": generation,
+        "expires_at": time.monotonic() + max_age,
     }
 
+def _room_status_ttl(now: datetime, end_of_day: datetime, has_bookings: bool) -> int:
+    """
+    Seconds a freshly computed room status stays fresh.
+    Rooms with no bookings today change rarely and get the longer CACHE_TTL_SECONDS;
+    either way the entry expires at midnight, when "today" moves on.
+    """
+    ttl = STATUS_CACHE_TTL_SECONDS if has_bookings else CACHE_TTL_SECONDS
+    return max(0, min(ttl, int((end_of_day - now).total_seconds())))
+
+# Notification emails are sent off the request thread
+_email_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="rooms-email")
+
 # Initialize DB tables once at startup (Flask 3 has no before_first_request)
-init_rooms_table()
-init_equipment_table()
-init_room_equipment_table()
+init_schema()
+_rooms_version = fetch_rooms_generation()
+
+# Apply cache invalidations published by other workers (and replicas)
+threading.Thread(
+    target=listen_for_room_changes,
+    args=(_drop_local_room_cache,),
+    name="rooms-cache-invalidation",
+    daemon=True,
+).start()
+
+def _is_positive_int(value) -> bool:
+    # bool is a subclass of int; True must not pass as a capacity of 1
+    return type(value) is int and value > 0
+
+def _clean_equipment(entries) -> list[dict]:
+    """
+    Validate equipment entries ({"name", "quantity"}) and return them with names stripped.
+    Raises a 400 on the first invalid entry.
+    """
+    cleaned_equipment = []
+    for entry in entries:
+        if not isinstance(entry, dict):
+            raise SmartRoomExceptions(400, "Bad Request", "Each equipment needs a name and positive quantity.")
+        equipment_name = entry.get("name")
+        quantity = entry.get("quantity")
+        if not isinstance(equipment_name, str) or not equipment_name.strip() or not _is_positive_int(quantity):
+            raise SmartRoomExceptions(400, "Bad Request", "Each equipment needs a name and positive quantity.")
+        cleaned_equipment.append({"name": equipment_name.strip(), "quantity": quantity})
+    return cleaned_equipment
+
+def _send_out_of_service_email(user_email: str, context: dict, booking_id):
+    """
+    Send one out-of-service notification and log the outcome. Runs on _email_executor.
+    """
+    try:
+        status_code, message_id = send_templated_email(
+            to_email=user_email,
+            subject="Room unavailable for your upcoming booking",
+            template_name="RoomOutOfService.html",
+            context=context,
+        )
+        if status_code != 202:
+            app.logger.warning(
+                "Out-of-service email returned status %s for booking %s",
+                status_code,
+                booking_id,
+            )
+        else:
+            app.logger.info(
+                "Out-of-service email sent for booking %s (message_id=%s)",
+                booking_id,
+                message_id,
+            )
+    except EmailConfigurationError as cfg_err:
+        app.logger.warning(
+            "Out-of-service email skipped due to configuration issue: %s",
+            cfg_err,
+        )
+    except Exception as email_err:
+        app.logger.exception(
+            "Failed to send out-of-service email for booking %s: %s",
+            booking_id,
+            email_err,
+        )
 
 def _tail_log(file_path: str, max_lines: int) -> list[str]:
     """
@@ -160,6 +309,25 @@ def _tail_log(file_path: str, max_lines: int) -> list[str]:
     except FileNotFoundError:
         return []
 
+# Pulls every column get_room_status needs from a bookings row in one C-level call
+_booking_columns = itemgetter("booking_id", "user_id", "room_id", "start_time", "end_time", "created_at")
+
+def _free_intervals(booked_ranges, day_start, day_end):
+    """
+    Return the (start, end) gaps between day_start and day_end not covered by
+    booked_ranges, which must be sorted by start time.
+    """
+    # free_from[i] is the latest end among bookings before i (or day_start)
+    free_from = list(accumulate((end for _, end in booked_ranges), max, initial=day_start))
+    gaps = [
+        (free, start)
+        for (start, _), free in zip(booked_ranges, free_from)
+        if start > free
+    ]
+    if free_from[-1] < day_end:
+        gaps.append((free_from[-1], day_end))
+    return gaps
+
 # ─────────────────────────────────────────────
 # 1. GET ALLL ROOMS
 # ─────────────────────────────────────────────
@@ -168,21 +336,51 @@ def get_all_rooms():
     """
     Fetch all rooms from the database.
     Returns a list of rooms with their details.
+    Supports If-None-Match: clients holding the current version get a 304 without a DB round-trip.
     """
-    cached_rooms = _get_cached_all_rooms()
-    if cached_rooms is not None:
-        return jsonify({"rooms": cached_rooms}), 200
-
-    rooms = fetch_all_rooms()
-    if not rooms:
+    version = _rooms_version
+    etag = _rooms_etag(version)
+    not_modified = _not_modified(etag, CACHE_TTL_SECONDS)
+    if not_modified is not None:
+        return not_modified
+
+    cached_body = _get_cached_all_rooms()
+    if cached_body is not None:
+        response = app.response_class(cached_body, mimetype="application/json")
+        return _set_validators(response, etag, CACHE_TTL_SECONDS), 200
+
+    batches = iter_all_rooms(ROOMS_STREAM_BATCH_SIZE)
+    # Pull the first batch up front so an empty table is still a 404
+    first_batch = next(batches, None)
+    if first_batch is None:
         raise SmartRoomExceptions(404, "Not Found", "No rooms found.")
-    for i in range(len(rooms)):
-        equipments = fetch_equipment_for_room(rooms[i]["room_id"])
-        room_obj = Room.room_with_equipment_dict(rooms[i], equipments)
-        rooms[i] = room_obj.to_dict()
 
-    _set_cached_all_rooms(rooms)
-    return jsonify({"rooms": rooms}), 200
+    response = app.response_class(
+        _stream_rooms_body(chain([first_batch], batches), version),
+        mimetype="application/json",
+    )
+    return _set_validators(response, etag, CACHE_TTL_SECONDS), 200
+
+def _stream_rooms_body(batches, version: int):
+    """
+    Yield the {"rooms": [...]} body one batch of rooms at a time and cache the
+    full body once the last batch has been sent.
+    """
+    chunks = [b'{"rooms":[']
+    yield chunks[0]
+    for batch in batches:
+        # Equipment arrives aggregated on each row; no per-room or per-batch query
+        chunk = b",".join(
+            app.json.dumps(Room.merge_row(room)).encode()
+            for room in batch
+        )
+        if len(chunks) > 1:
+            chunk = b"," + chunk
+        chunks.append(chunk)
+        yield chunk
+    chunks.append(b"]}")
+    yield chunks[-1]
+    _set_cached_all_rooms(b"".join(chunks), version)
 
 # ─────────────────────────────────────────────
 # 2. GET A ROOM BY ITS ID
@@ -192,6 +390,7 @@ def get_room(room_id):
     """
     Fetch a single room by its ID.
     Returns the room details if found.
+    Supports If-None-Match in the same way as GET /rooms.
     """
     payload, error = require_auth()
     if error:
@@ -200,19 +399,24 @@ def get_room(room_id):
     if not is_human_user(payload):
         raise SmartRoomExceptions(403, "Forbidden", "Unauthorized. Human user role required.")
 
-    cached_room = _get_cached_room(room_id)
-    if cached_room is not None:
-        return jsonify({"room": cached_room}), 200
-    
-    room = fetch_room(room_id)
+    version = _rooms_version
+    etag = _rooms_etag(version)
+    not_modified = _not_modified(etag, CACHE_TTL_SECONDS)
+    if not_modified is not None:
+        return not_modified
+
+    cached_body = _get_cached_room(room_id)
+    if cached_body is not None:
+        response = app.response_class(cached_body, mimetype="application/json")
+        return _set_validators(response, etag, CACHE_TTL_SECONDS), 200
+
+    room = fetch_room_with_equipment(room_id)
     if not room:
         raise SmartRoomExceptions(404, "Not Found", "Room not found. Make sure the ID is valid.")
-    equipments = fetch_equipment_for_room(room_id)
-    room_obj = Room.room_with_equipment_dict(room, equipments)
 
-    room_dict = room_obj.to_dict()
-    _set_cached_room(room_id, room_dict)
-    return jsonify({"room": room_dict}), 200
+    response = jsonify({"room": Room.merge_dict(room, room["equipment"])})
+    _set_cached_room(room_id, response.get_data(), version)
+    return _set_validators(response, etag, CACHE_TTL_SECONDS), 200
 
 # ─────────────────────────────────────────────
 # 3. ADD NEW ROOM
@@ -227,28 +431,21 @@ def add_room():
         raise SmartRoomExceptions(403, "Forbidden", "Unauthorized. Admin or Facility Manager role required.")
 
     data = request.get_json() or {}
-    name = (data.get("name") or "").strip()
+    name = data.get("name") or ""
     capacity = data.get("capacity")
-    location = (data.get("location") or "").strip()
+    location = data.get("location") or ""
     equipment_entries = data.get("equipment") or []
-    if not name:
+    if not isinstance(name, str) or not name.strip():
         raise SmartRoomExceptions(400, "Bad Request", "Room name is required.")
-    if not isinstance(capacity, int) or capacity <= 0:
+    if not _is_positive_int(capacity):
         raise SmartRoomExceptions(400, "Bad Request", "The capacity must be a positive integer.")
+    if not isinstance(location, str):
+        raise SmartRoomExceptions(400, "Bad Request", "Location must be a string.")
     if not isinstance(equipment_entries, list) or not equipment_entries:
         raise SmartRoomExceptions(400, "Bad Request", "Please make sure that you have at least on equipment in the room.")
-    cleaned_equipment = []
-    for entry in equipment_entries:
-        equipment_name = (entry.get("name") or "").strip()
-        quantity = entry.get("quantity")
-        if not equipment_name or not isinstance(quantity, int) or quantity <= 0:
-            raise SmartRoomExceptions(400, "Bad Request", "Each equipment needs a name and positive quantity.")
-        cleaned_equipment.append(
-            {
-                "name": equipment_name,
-                "quantity": quantity,
-            }
-        )
+    cleaned_equipment = _clean_equipment(equipment_entries)
+    name = name.strip()
+    location = location.strip()
     try:
         room_row = create_room(name, capacity, location)
     except UniqueViolation:
@@ -257,9 +454,8 @@ def add_room():
     set_room_equipment(room_row["room_id"], cleaned_equipment)
 
     equipment_with_details = fetch_equipment_for_room(room_row["room_id"])
-    room_obj = Room.room_with_equipment_dict(room_row, equipment_with_details)
     _invalidate_room_cache()
-    raise SmartRoomExceptions(201, "Created", {"room": room_obj.to_dict()})
+    raise SmartRoomExceptions(201, "Created", {"room": Room.merge_dict(room_row, equipment_with_details)})
 
 # ─────────────────────────────────────────────
 # 4. UPDATE ROOM DETAILS
@@ -281,40 +477,33 @@ def update_room_details(current_name):
         raise SmartRoomExceptions(403, "Forbidden", "Unauthorized. Admin or Facility Manager role required.")
 
     if new_name is not None:
-        new_name = new_name.strip()
-        if not new_name:
+        if not isinstance(new_name, str) or not new_name.strip():
             raise SmartRoomExceptions(400, "Bad Request", "Room name cannot be empty.")
+        new_name = new_name.strip()
     if capacity is not None:
-        if not isinstance(capacity, int) or capacity <= 0:
+        if not _is_positive_int(capacity):
             raise SmartRoomExceptions(400, "Bad Request", "The capacity must be a positive integer.")
     if location is not None:
+        if not isinstance(location, str):
+            raise SmartRoomExceptions(400, "Bad Request", "Location must be a string.")
         location = location.strip()
+    # Validate equipment before touching the room so a bad entry leaves nothing half-updated
+    cleaned_equipment = None
+    if equipments is not None:
+        if not isinstance(equipments, list):
+            raise SmartRoomExceptions(400, "Bad Request", "Equipments must be provided as a list.")
+        cleaned_equipment = _clean_equipment(equipments)
 
     updated_room = update_room(current_name, new_name=new_name, capacity=capacity, location=location)
     if not updated_room:
         raise SmartRoomExceptions(404, "Not Found", "Room not found or no fields to update.")
 
-    if equipments is not None:
-        if not isinstance(equipments, list):
-            raise SmartRoomExceptions(400, "Bad Request", "Equipments must be provided as a list.")
-        cleaned_equipment = []
-        for e in equipments:
-            equipment_name = (e.get("name") or "").strip()
-            quantity = e.get("quantity")
-            if not equipment_name or not isinstance(quantity, int) or quantity <= 0:
-                raise SmartRoomExceptions(400, "Bad Request", "Each equipment needs a name and positive quantity.")
-            cleaned_equipment.append(
-                {
-                    "name": equipment_name,
-                    "quantity": quantity,
-                }
-            )
+    if cleaned_equipment is not None:
         set_room_equipment(updated_room["room_id"], cleaned_equipment)
 
     equipment_with_details = fetch_equipment_for_room(updated_room["room_id"])
-    room_obj = Room.room_with_equipment_dict(updated_room, equipment_with_details)
     _invalidate_room_cache(updated_room["room_id"])
-    return jsonify({"room": room_obj.to_dict()}), 200
+    return jsonify({"room": Room.merge_dict(updated_room, equipment_with_details)}), 200
 
 # ─────────────────────────────────────────────
 # 5. DELETE A ROOM
@@ -343,6 +532,7 @@ def delete_room_endpoint(room_id: int):
 def get_room_status(room_id: int):
     """
     Returns all bookings for the room and computes available time intervals for the day.
+    Supports If-None-Match with an ETag hashed from the response body.
     """
 
     payload, error = require_auth()
@@ -354,75 +544,67 @@ def get_room_status(room_id: int):
 
     cached_status = _get_cached_room_status(room_id)
     if cached_status is not None:
-        return jsonify(cached_status), 200
-    
+        body, etag, max_age = cached_status
+        not_modified = _not_modified(etag, max_age, weak=False)
+        if not_modified is not None:
+            return not_modified
+        response = app.response_class(body, mimetype="application/json")
+        return _set_validators(response, etag, max_age, weak=False), 200
+
+    generation = _status_generation
     # Verify room exists
     room = fetch_room(room_id)
     if not room:
         raise SmartRoomExceptions(404, "Not Found", "Room not found.")
 
-    # Fetch all bookings for this room
-    bookings = fetch_bookings_for_room(room_id) or []
-
-    # Filter bookings for the current day
-    today = datetime.now().date()
+    now = datetime.now()
+    today = now.date()
     start_of_day = datetime.combine(today, datetime.min.time())  # 00:00
     end_of_day = datetime.combine(today, datetime.max.time())    # 24:00
 
+    # Only today's bookings, already ordered by start_time
+    bookings = fetch_bookings_for_room_on_date(room_id, today)
+
+    # Single pass: read each booking's timestamps once and reuse them for
+    # both the availability computation and the response rows.
+    # Datetimes are left to the JSON provider (orjson) to encode.
     booked_ranges = []
+    todays_bookings = []
     for b in bookings:
-        # Parse booking dict directly
-        start_time = b.get("start_time")
-        end_time = b.get("end_time")
-        if start_time and end_time and start_time.date() == today and end_time.date() == today:
+        booking_id, user_id, booked_room_id, start_time, end_time, created_at = _booking_columns(b)
+        todays_bookings.append({
+            "id": booking_id,
+            "user_id": user_id,
+            "room_id": booked_room_id,
+            "start_time": start_time,
+            "end_time": end_time,
+            "created_at": created_at
+        })
+        if end_time and end_time.date() == today:
             booked_ranges.append((start_time, end_time))
 
-
-    # Sort by start time
-    booked_ranges.sort()
-
-    # Compute availability intervals for the day
-    availability_intervals = []
-    current_start = start_of_day
-
-    for b_start, b_end in booked_ranges:
-        # Add interval before the current booking
-        if b_start > current_start:
-            availability_intervals.append({
-                "start_time": current_start.isoformat(),
-                "end_time": b_start.isoformat()
-            })
-        # Update current_start to the end of the current booking
-        current_start = max(current_start, b_end)
-
-    # Add final interval if room is free after the last booking
-    if current_start < end_of_day:
-        availability_intervals.append({
-            "start_time": current_start.isoformat(),
-            "end_time": end_of_day.isoformat()
-        })
+    availability_intervals = [
+        {"start_time": gap_start, "end_time": gap_end}
+        for gap_start, gap_end in _free_intervals(booked_ranges, start_of_day, end_of_day)
+    ]
 
     response_payload = {
         "room_id": room_id,
         "room_name": room.get("room_name"),
         "room_available": len(availability_intervals) > 0,
-        "bookings": [
-            {
-                "id": b.get("booking_id"),
-                "user_id": b.get("user_id"),
-                "room_id": b.get("room_id"),
-                "start_time": b.get("start_time").isoformat() if b.get("start_time") else None,
-                "end_time": b.get("end_time").isoformat() if b.get("end_time") else None,
-                "created_at": b.get("created_at").isoformat() if b.get("created_at") else None
-            }
-            for b in bookings
-            if b.get("start_time") and b.get("start_time").date() == today
-        ],
+        "bookings": todays_bookings,
         "availability_intervals": availability_intervals
     }
 
-    _set_cached_room_status(room_id, response_payload)
-    return jsonify(response_payload), 200
+    response = jsonify(response_payload)
+    body = response.get_data()
+    etag = hashlib.blake2s(body, digest_size=8).hexdigest()
+    max_age = _room_status_ttl(now, end_of_day, bool(todays_bookings))
+    _set_cached_room_status(room_id, body, etag, max_age, generation)
+    not_modified = _not_modified(etag, max_age, weak=False)
+    if not_modified is not None:
+        return not_modified
+    return _set_validators(response, etag, max_age, weak=False), 200
 
 # ─────────────────────────────────────────────
 # 7. TOGGLE ROOM AVAILABILITY
@@ -439,20 +621,16 @@ def toggle_room_availability(room_id):
     if not is_admin(payload):
         raise SmartRoomExceptions(403, "Forbidden", "Unauthorized. Admin or Facility Manager role required.")
 
-    # Fetch the room
-    room = fetch_room(room_id)
-    if not room:
+    # Read and flip in one statement so concurrent toggles cannot overwrite each other
+    toggled = toggle_room_availability_flag(room_id)
+    if not toggled:
         raise SmartRoomExceptions(404, "Not Found", "Room not found.")
 
-    # Toggle availability
-    new_availability = not room["is_available"]
-    update_room_availability(room_id, new_availability)
-
     _invalidate_room_cache(room_id)
     return jsonify({
         "message": f"Room {room_id} availability toggled.",
         "room_id": room_id,
-        "is_available": new_availability
+        "is_available": toggled["is_available"]
     }), 200
 
 # ─────────────────────────────────────────────
@@ -471,26 +649,22 @@ def set_unset_out_of_service_endpoint(room_id):
     if is_out_of_service is None:
         raise SmartRoomExceptions(400, "Bad Request", "is_out_of_service field is required.")
 
-    updated_room = set_unset_out_of_service(room_id, is_out_of_service)
+    updated_room, upcoming = set_unset_out_of_service(room_id, is_out_of_service, datetime.now())
     if not updated_room:
         raise SmartRoomExceptions(404, "Not Found", "Room not found.")
 
     status = "out of service" if is_out_of_service else "in service"
 
     if is_out_of_service:
-        bookings = fetch_bookings_for_room(room_id) or []
-        now = datetime.now()
-        for booking_row in bookings:
-            # Parse booking dict directly
+        # One query for every affected user instead of one per booking
+        contacts = fetch_user_contacts({b.get("user_id") for b in upcoming})
+        for booking_row in upcoming:
             booking_id = booking_row.get("booking_id")
             user_id = booking_row.get("user_id")
             start_time = booking_row.get("start_time")
             end_time = booking_row.get("end_time")
-            
-            if not start_time or start_time <= now:
-                continue
 
-            user_contact = fetch_user_contact(user_id)
+            user_contact = contacts.get(user_id)
             if not user_contact:
                 app.logger.warning(
                     "Room %s marked out of service but user %s contact missing for booking %s.",
@@ -510,8 +684,8 @@ def set_unset_out_of_service_endpoint(room_id):
                 )
                 continue
 
-            start_display = start_time.strftime("%A, %B %d, %Y at %I:%M %p")
-            end_display = end_time.strftime("%A, %B %d, %Y at %I:%M %p") if end_time else ""
+            start_display = format_email_datetime(start_time)
+            end_display = format_email_datetime(end_time) if end_time else ""
 
             context = {
                 "first_name": user_contact.get("first_name", ""),
@@ -522,37 +696,8 @@ def set_unset_out_of_service_endpoint(room_id):
                 "end_time": end_display,
                 "booking_id": str(booking_id),
             }
-
-            try:
-                status_code, message_id = send_templated_email(
-                    to_email=user_email,
-                    subject="Room unavailable for your upcoming booking",
-                    template_name="RoomOutOfService.html",
-                    context=context,
-                )
-                if status_code != 202:
-                    app.logger.warning(
-                        "Out-of-service email returned status %s for booking %s",
-                        status_code,
-                        booking_id,
-                    )
-                else:
-                    app.logger.info(
-                        "Out-of-service email sent for booking %s (message_id=%s)",
-                        booking_id,
-                        message_id,
-                    )
-            except EmailConfigurationError as cfg_err:
-                app.logger.warning(
-                    "Out-of-service email skipped due to configuration issue: %s",
-                    cfg_err,
-                )
-            except Exception as email_err:
-                app.logger.exception(
-                    "Failed to send out-of-service email for booking %s: %s",
-                    booking_id,
-                    email_err,
-                )
+            # Sent in the background; the response does not wait on SendGrid
+            _email_executor.submit(_send_out_of_service_email, user_email, context, booking_id)
 
     _invalidate_room_cache(room_id)
     return jsonify({
@@ -586,5 +731,11 @@ def get_service_logs():
 # ─────────────────────────────────────────────
 
 if __name__ == "__main__":
-    # For development only; later we'll run via gunicorn or Docker
-    app.run(host="0.0.0.0", port=5002, debug=True)
+    # For development only; the container runs the app under gunicorn (see Dockerfile).
+    # One thread per request, each borrowing its own pooled connection, so
+    # concurrent reads overlap their DB waits instead of queueing.
+    # The Werkzeug debugger can run arbitrary code: opt in with --dev, local-only
+    if "--dev" in sys.argv:
+        app.run(host="127.0.0.1", port=5002, debug=True, threaded=True)
+    else:
+        app.run(host="0.0.0.0", port=5002, threaded=True)
@@ -31,4 +31,33 @@ class Room:
             location=room_data["location"],
             capacity=room_data["capacity"],
             equipment=equipment_data  
-        )   
+        )
+
+    @staticmethod
+    def merge_dict(room_data, equipment_data) -> dict:
+        """
+        Build the to_dict() shape straight from a room row and its equipment,
+        without creating a Room object in between.
+        """
+        return {
+            "room_id": room_data["room_id"],
+            "name": room_data["room_name"],
+            "location": room_data["location"],
+            "capacity": room_data["capacity"],
+            "equipment": equipment_data,
+        }
+
+    @staticmethod
+    def merge_row(row) -> dict:
+        """
+        Same as merge_dict, for a positional
+        (room_id, room_name, capacity, location, equipment) row.
+        """
+        room_id, room_name, capacity, location, equipment_data = row
+        return {
+            "room_id": room_id,
+            "name": room_name,
+            "location": location,
+            "capacity": capacity,
+            "equipment": equipment_data,
+        }
@@ -1,17 +1,19 @@
 import logging
 import sys
 import time
-import uuid
 import re
 import secrets
 import hashlib
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from functools import lru_cache
 
 from flask import Flask, request, jsonify, g
+from psycopg2.errors import UniqueViolation
 
 from services.users_service.db import (
-    init_users_table,
+    init_schema,
     fetch_one,
     fetch_all,
     execute,
@@ -24,6 +26,7 @@ from common.email_service import send_templated_email, EmailConfigurationError
 from common.security import (
     hash_password,
     verify_password,
+    password_needs_rehash,
     create_access_token,
 )
 from common.RBAC import (
@@ -32,8 +35,10 @@ from common.RBAC import (
 )
 from common.exeptions import *
 from common.config import API_VERSION
+from common.json_provider import OrjsonProvider
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 
 # ─────────────────────────────────────────
 # Logging configuration (stdout for Docker)
@@ -60,8 +65,9 @@ def handle_smart_room_exception(e):
 
 @app.before_request
 def start_audit_logging():
-    g.request_id = str(uuid.uuid4())
-    g.start_time = time.time()
+    # Opaque correlation token: 128 random bits, without building a UUID object
+    g.request_id = os.urandom(16).hex()
+    g.start_ns = time.monotonic_ns()
     app.logger.info(
         "REQUEST",
         extra={
@@ -75,21 +81,69 @@ def start_audit_logging():
 
 @app.after_request
 def end_audit_logging(response):
-    duration = time.time() - g.get("start_time", time.time())
+    # Monotonic clock: an NTP step mid-request cannot skew or negate the duration
+    duration_ms = (time.monotonic_ns() - g.get("start_ns", time.monotonic_ns())) // 1_000_000
     app.logger.info(
         "RESPONSE",
         extra={
             "request_id": g.get("request_id"),
             "status_code": response.status_code,
             "path": request.path,
-            "duration_ms": int(duration * 1000),
+            "duration_ms": duration_ms,
         },
     )
     response.headers["X-Request-ID"] = g.get("request_id", "")
     return response
 
-# Initialize DB tables once at startup (Flask 3 has no before_first_request)
-init_users_table()
+# Initialize DB tables once at startup (Flask 3 has no before_first_request).
+# After the first worker (or `flask init-db`) has applied the DDL this is a
+# single schema_meta lookup, so forked workers do not re-run it.
+init_schema()
+
+
+@app.cli.command("init-db")
+def init_db_command():
+    """
+    Apply the users schema. Run once per deploy, before scaling out workers:
+    flask --app services.users_service.app init-db
+    """
+    init_schema()
+
+# Notification emails are sent off the request thread
+_email_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="users-email")
+
+def _send_signin_email(user: User):
+    """
+    Send the sign-in notification for user and log the outcome. Runs on _email_executor.
+    """
+    try:
+        status_code, message_id = send_templated_email(
+            to_email=user.email,
+            subject="Smart Meeting Rooms sign-in",
+            template_name="SignIn.html",
+            context={
+                "first_name": user.first_name,
+                "last_name": user.last_name,
+                "username": user.username,
+                "email": user.email,
+            },
+        )
+        if status_code != 202:
+            app.logger.warning(
+                "Sign-in email returned unexpected status %s for user %s",
+                status_code,
+                user.username,
+            )
+        else:
+            app.logger.info(
+                "Sign-in email sent for user %s (message_id=%s)",
+                user.username,
+                message_id,
+            )
+    except EmailConfigurationError as cfg_err:
+        app.logger.warning("Sign-in email skipped: %s", cfg_err)
+    except Exception as email_err:
+        app.logger.exception("Failed to send sign-in email: %s", email_err)
 
 def _tail_log(file_path: str, max_lines: int) -> list[str]:
     """
@@ -103,20 +157,61 @@ def _tail_log(file_path: str, max_lines: int) -> list[str]:
         return []
 
 # Precompiled regex patterns matching your rules
-USERNAME_PATTERN = re.compile(r'^[A-Za-z0-9][A-Za-z0-9._-]*[A-Za-z0-9]$')
-EMAIL_PATTERN = re.compile(r'^[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}$', re.IGNORECASE)
+USERNAME_PATTERN = re.compile(r'\A[A-Za-z0-9][A-Za-z0-9._-]*[A-Za-z0-9]\Z')
+# Shape rule plus "no two of ._- in a row" in one pass; valid names (the common case) only run this one
+VALID_USERNAME_PATTERN = re.compile(r'\A(?!.*[._-]{2})[A-Za-z0-9][A-Za-z0-9._-]*[A-Za-z0-9]\Z')
+# Bounded parts; validate_email checks the overall lengths before matching
+EMAIL_PATTERN = re.compile(r'\A[A-Za-z0-9._%+-]{1,64}@[A-Za-z0-9.-]{1,253}\.[A-Za-z]{2,}\Z', re.IGNORECASE)
 
-RESERVED_USERNAMES = {"admin", "root", "support", "system", "null"}
+RESERVED_USERNAMES = frozenset({"admin", "root", "support", "system", "null"})
 
-ALLOWED_ROLES = {
+ALLOWED_ROLES = frozenset({
     "regular",
     "admin",
     "facility_manager",
     "moderator",
     "auditor",
     "service_account",
+})
+
+# Checked against when the username does not exist, so a miss costs the same
+# password-hash work as a wrong password and login timing does not reveal
+# which usernames are registered. Hashed once at import.
+_DUMMY_PASSWORD_HASH = hash_password("dummy-for-timing-equalization")
+
+# Keyset page size for GET /users
+USERS_PAGE_DEFAULT_LIMIT = 100
+USERS_PAGE_MAX_LIMIT = 500
+
+# 409 messages keyed by the users UNIQUE constraint that was violated
+UNIQUE_CONFLICT_MESSAGES = {
+    "users_username_key": "Username already in use.",
+    "users_email_key": "Email already in use.",
 }
 
+def _unique_conflict(error: UniqueViolation) -> SmartRoomExceptions:
+    """
+    Map a unique-constraint violation on users to the matching 409.
+    """
+    message = UNIQUE_CONFLICT_MESSAGES.get(error.diag.constraint_name, "Username or email already in use.")
+    return SmartRoomExceptions(409, "Conflict", message)
+
+
+@lru_cache(maxsize=128)
+def _build_update_sql(columns: tuple[str, ...]) -> str:
+    """
+    UPDATE statement setting `columns` (in the given order) for one user id.
+    Columns are always appended in a fixed order, so there are at most
+    2^6 shapes and each is built, and prepared, once.
+    """
+    set_clause = ", ".join(f"{column} = %s" for column in columns)
+    return f"""
+    UPDATE users
+       SET {set_clause}
+     WHERE id = %s
+     RETURNING id, first_name, last_name, username, email, role;
+    """
+
 
 def validate_username(username: str) -> str | None:
     """
@@ -125,13 +220,13 @@ def validate_username(username: str) -> str | None:
     if not (3 <= len(username) <= 15):
         return "Username must be between 3 and 15 characters."
 
-    if not USERNAME_PATTERN.match(username):
-        return (
-            "Username must start and end with a letter or digit and may contain "
-            "letters, digits, ., _ and - in the middle (no spaces)."
-        )
-
-    if re.search(r'(\.|_|-){2,}', username):
+    if not VALID_USERNAME_PATTERN.match(username):
+        # Rejected: work out which rule failed for the error message
+        if not USERNAME_PATTERN.match(username):
+            return (
+                "Username must start and end with a letter or digit and may contain "
+                "letters, digits, ., _ and - in the middle (no spaces)."
+            )
         return "Username cannot contain two special characters (., _, -) in a row."
 
     if username.lower() in RESERVED_USERNAMES:
@@ -144,16 +239,16 @@ def validate_email(email: str) -> str | None:
     """
     raise error message if invalid, else None.
     """
-    if not EMAIL_PATTERN.match(email):
-        return "Invalid email format."
-
+    # Length limits first, so oversized input never reaches the regex
     if len(email) > 254:
         return "Email is too long (must be at most 254 characters)."
 
-    local_part = email.split("@", 1)[0]
-    if len(local_part) > 64:
+    if email.find("@") > 64:
         return "Email local part (before @) must be at most 64 characters."
 
+    if not EMAIL_PATTERN.match(email):
+        return "Invalid email format."
+
     return None
 
 # ─────────────────────────────────────────────
@@ -189,6 +284,11 @@ def register_user():
     password = data["password"]
     role = data.get("role", "regular")
 
+    # Validate role first: a set lookup, cheaper than the regex checks below
+    # (the DB also checks it)
+    if role not in ALLOWED_ROLES:
+        raise SmartRoomExceptions(400, "Bad Request", "Invalid role value.")
+
     # Validate username
     username_error = validate_username(username)
     if username_error:
@@ -199,18 +299,6 @@ def register_user():
     if email_error:
         raise SmartRoomExceptions(400, "Bad Request", email_error)
 
-    # Validate role (just in case, even though DB also checks)
-    if role not in ALLOWED_ROLES:
-        raise SmartRoomExceptions(400, "Bad Request", "Invalid role value.")
-    
-    # Check if username or email already exists
-    existing = fetch_one(
-        "SELECT 1 FROM users WHERE username = %s OR email = %s",
-        (username, email),
-    )
-    if existing:
-        raise SmartRoomExceptions(409, "Conflict", "Username or email already in use.")
-
     password_hash = hash_password(password)
 
     insert_sql = """
@@ -219,22 +307,16 @@ def register_user():
     RETURNING id, first_name, last_name, username, email, role;
     """
 
-    row = fetch_one(
-        insert_sql,
-        (first_name, last_name, username, email, password_hash, role),
-    )
-
-    user = User(
-        id=row["id"],
-        first_name=row["first_name"],
-        last_name=row["last_name"],
-        username=row["username"],
-        email=row["email"],
-        password_hash="",
-        role=row["role"],
-    )
+    # The UNIQUE constraints reject taken usernames/emails; no separate lookup first
+    try:
+        row = fetch_one(
+            insert_sql,
+            (first_name, last_name, username, email, password_hash, role),
+        )
+    except UniqueViolation as e:
+        raise _unique_conflict(e)
 
-    return jsonify({"user": user.to_public_dict()}), 201
+    return jsonify({"user": User.public_dict_from_row(row)}), 201
 
 
 # ─────────────────────────────────────────────
@@ -259,13 +341,29 @@ def login():
     if not username or not password:
         raise SmartRoomExceptions(400, "Bad Request", "Username and password are required.")
 
-    row = fetch_one("SELECT * FROM users WHERE username = %s", (username,))
+    row = fetch_one(
+        "SELECT id, first_name, last_name, username, email, password_hash, role "
+        "FROM users WHERE username = %s",
+        (username,),
+        prepare=True,
+    )
     if not row:
+        verify_password(password, _DUMMY_PASSWORD_HASH)
         raise SmartRoomExceptions(401, "Unauthorized", "Invalid credentials.")
     
     if not verify_password(password, row["password_hash"]):
         raise SmartRoomExceptions(401, "Unauthorized", "Invalid credentials.")
 
+    # Upgrade hashes made with older hash settings while we still hold the plain password
+    if password_needs_rehash(row["password_hash"]):
+        try:
+            execute(
+                "UPDATE users SET password_hash = %s WHERE id = %s",
+                (hash_password(password), row["id"]),
+            )
+        except Exception as rehash_err:
+            app.logger.warning("Password rehash failed for user %s: %s", row["id"], rehash_err)
+
     token = create_access_token(row["id"], row["role"])
 
     user = User(
@@ -278,35 +376,8 @@ def login():
         role=row["role"],
     )
 
-    # Fire-and-forget sign-in email; logging captures any send issues without blocking login.
-    try:
-        status_code, message_id = send_templated_email(
-            to_email=user.email,
-            subject="Smart Meeting Rooms sign-in",
-            template_name="SignIn.html",
-            context={
-                "first_name": user.first_name,
-                "last_name": user.last_name,
-                "username": user.username,
-                "email": user.email,
-            },
-        )
-        if status_code != 202:
-            app.logger.warning(
-                "Sign-in email returned unexpected status %s for user %s",
-                status_code,
-                user.username,
-            )
-        else:
-            app.logger.info(
-                "Sign-in email sent for user %s (message_id=%s)",
-                user.username,
-                message_id,
-            )
-    except EmailConfigurationError as cfg_err:
-        app.logger.warning("Sign-in email skipped: %s", cfg_err)
-    except Exception as email_err:
-        app.logger.exception("Failed to send sign-in email: %s", email_err)
+    # Sent in the background; login does not wait on SendGrid
+    _email_executor.submit(_send_signin_email, user)
 
     return jsonify({
         "access_token": token,
@@ -453,21 +524,12 @@ def get_my_profile():
     row = fetch_one(
         "SELECT id, first_name, last_name, username, email, role FROM users WHERE id = %s",
         (user_id,),
+        prepare=True,
     )
     if not row:
         raise SmartRoomExceptions(404, "Not Found", "User not found.")
 
-    user = User(
-        id=row["id"],
-        first_name=row["first_name"],
-        last_name=row["last_name"],
-        username=row["username"],
-        email=row["email"],
-        password_hash="",
-        role=row["role"],
-    )
-
-    return jsonify({"user": user.to_public_dict()}), 200
+    return jsonify({"user": User.public_dict_from_row(row)}), 200
 
 
 # ─────────────────────────────────────────────
@@ -489,17 +551,17 @@ def update_my_profile():
     user_id = int(payload["sub"])
     data = request.get_json() or {}
 
-    fields_to_update = []
+    columns = []
     params = []
 
     # First name
     if "first_name" in data and data["first_name"].strip():
-        fields_to_update.append("first_name = %s")
+        columns.append("first_name")
         params.append(data["first_name"].strip())
 
     # Last name
     if "last_name" in data and data["last_name"].strip():
-        fields_to_update.append("last_name = %s")
+        columns.append("last_name")
         params.append(data["last_name"].strip())
 
     # Username
@@ -509,15 +571,7 @@ def update_my_profile():
         if username_error:
             raise SmartRoomExceptions(400, "Bad Request", username_error)
 
-        # Check if taken by someone else
-        existing = fetch_one(
-            "SELECT id FROM users WHERE username = %s AND id <> %s",
-            (new_username, user_id),
-        )
-        if existing:
-            raise SmartRoomExceptions(409, "Conflict", "Username already in use.")
-
-        fields_to_update.append("username = %s")
+        columns.append("username")
         params.append(new_username)
 
     # Email
@@ -527,51 +581,30 @@ def update_my_profile():
         if email_error:
             raise SmartRoomExceptions(400, "Bad Request", email_error)
 
-        existing = fetch_one(
-            "SELECT id FROM users WHERE email = %s AND id <> %s",
-            (new_email, user_id),
-        )
-        if existing:
-            raise SmartRoomExceptions(409, "Conflict", "Email already in use.")
-
-        fields_to_update.append("email = %s")
+        columns.append("email")
         params.append(new_email)
 
     # Password
     if "password" in data and data["password"]:
         new_password_hash = hash_password(data["password"])
-        fields_to_update.append("password_hash = %s")
+        columns.append("password_hash")
         params.append(new_password_hash)
 
-    if not fields_to_update:
+    if not columns:
         raise SmartRoomExceptions(400, "Bad Request", "No valid fields provided to update.")
 
-    # Build dynamic UPDATE
-    set_clause = ", ".join(fields_to_update)
     params.append(user_id)
+    update_sql = _build_update_sql(tuple(columns))
 
-    update_sql = f"""
-    UPDATE users
-       SET {set_clause}
-     WHERE id = %s
-     RETURNING id, first_name, last_name, username, email, role;
-    """
-
-    row = fetch_one(update_sql, tuple(params))
+    # Taken usernames/emails surface as UNIQUE violations from the UPDATE itself
+    try:
+        row = fetch_one(update_sql, tuple(params), prepare=True)
+    except UniqueViolation as e:
+        raise _unique_conflict(e)
     if not row:
         raise SmartRoomExceptions(404, "Not Found", "User not found.")
 
-    user = User(
-        id=row["id"],
-        first_name=row["first_name"],
-        last_name=row["last_name"],
-        username=row["username"],
-        email=row["email"],
-        password_hash="",
-        role=row["role"],
-    )
-
-    return jsonify({"user": user.to_public_dict()}), 200
+    return jsonify({"user": User.public_dict_from_row(row)}), 200
 
 
 # ─────────────────────────────────────────────
@@ -582,6 +615,7 @@ def update_my_profile():
 def delete_my_account():
     """
     Delete the currently authenticated user's account.
+    Responds 204 with an empty body.
 
     Note: Later we may discuss how this interacts with bookings/reviews.
     """
@@ -595,7 +629,7 @@ def delete_my_account():
     if deleted == 0:
         raise SmartRoomExceptions(404, "Not Found", "User not found.")
 
-    return jsonify({"message": "Account deleted successfully."}), 200
+    return "", 204
 
 
 # ─────────────────────────────────────────────
@@ -605,8 +639,16 @@ def delete_my_account():
 @app.route(f"{API_VERSION}/users", methods=["GET"])
 def get_all_users():
     """
-    Return all users.
+    Return users one page at a time, ordered by id.
     Admin-only endpoint.
+
+    Query params:
+    - after: return users with id greater than this (default 0)
+    - limit: page size (default 100, 1 to 500)
+    Non-integer or out-of-range values are rejected with 400.
+
+    next_cursor is the id to pass as `after` for the next page,
+    or null when this is the last page.
     """
     payload, error = require_auth()
     if error:
@@ -615,24 +657,27 @@ def get_all_users():
     if not is_admin(payload):
         raise SmartRoomExceptions(403, "Forbidden", "Admins only.")
 
+    try:
+        after = int(request.args.get("after", 0))
+        limit = int(request.args.get("limit", USERS_PAGE_DEFAULT_LIMIT))
+    except ValueError:
+        raise SmartRoomExceptions(400, "Bad Request", "after and limit must be integers.")
+    if after < 0:
+        raise SmartRoomExceptions(400, "Bad Request", "after must be 0 or greater.")
+    if not 1 <= limit <= USERS_PAGE_MAX_LIMIT:
+        raise SmartRoomExceptions(400, "Bad Request", f"limit must be between 1 and {USERS_PAGE_MAX_LIMIT}.")
+
+    # Range scan on the primary key; the page never grows with the table
     rows = fetch_all(
-        "SELECT id, first_name, last_name, username, email, role FROM users ORDER BY id"
+        "SELECT id, first_name, last_name, username, email, role FROM users "
+        "WHERE id > %s ORDER BY id LIMIT %s",
+        (after, limit),
     )
 
-    users = [
-        User(
-            id=row["id"],
-            first_name=row["first_name"],
-            last_name=row["last_name"],
-            username=row["username"],
-            email=row["email"],
-            password_hash="",
-            role=row["role"],
-        ).to_public_dict()
-        for row in rows
-    ]
+    users = [User.public_dict_from_row(row) for row in rows]
+    next_cursor = users[-1]["id"] if len(users) == limit else None
 
-    return jsonify({"users": users}), 200
+    return jsonify({"users": users, "next_cursor": next_cursor}), 200
 
 
 # ─────────────────────────────────────────────
@@ -657,6 +702,7 @@ def get_user_by_username(username: str):
     row = fetch_one(
         "SELECT id, first_name, last_name, username, email, role FROM users WHERE username = %s",
         (target_username,),
+        prepare=True,
     )
     if not row:
         raise SmartRoomExceptions(404, "Not Found", "User not found.")
@@ -665,17 +711,7 @@ def get_user_by_username(username: str):
     if not is_admin(payload) and row["id"] != user_id:
         raise SmartRoomExceptions(403, "Forbidden", "Forbidden.")
     
-    user = User(
-        id=row["id"],
-        first_name=row["first_name"],
-        last_name=row["last_name"],
-        username=row["username"],
-        email=row["email"],
-        password_hash="",
-        role=row["role"],
-    )
-
-    return jsonify({"user": user.to_public_dict()}), 200
+    return jsonify({"user": User.public_dict_from_row(row)}), 200
 
 
 # ─────────────────────────────────────────────
@@ -698,17 +734,21 @@ def admin_update_user(user_id: int):
 
     data = request.get_json() or {}
 
-    fields_to_update = []
+    # Reject a bad role before any regex or password-hash work
+    if "role" in data and data["role"] not in ALLOWED_ROLES:
+        raise SmartRoomExceptions(400, "Bad Request", "Invalid role value.")
+
+    columns = []
     params = []
 
     # First name
     if "first_name" in data and data["first_name"].strip():
-        fields_to_update.append("first_name = %s")
+        columns.append("first_name")
         params.append(data["first_name"].strip())
 
     # Last name
     if "last_name" in data and data["last_name"].strip():
-        fields_to_update.append("last_name = %s")
+        columns.append("last_name")
         params.append(data["last_name"].strip())
 
     # Username
@@ -718,14 +758,7 @@ def admin_update_user(user_id: int):
         if username_error:
             raise SmartRoomExceptions(400, "Bad Request", username_error)
 
-        existing = fetch_one(
-            "SELECT id FROM users WHERE username = %s AND id <> %s",
-            (new_username, user_id),
-        )
-        if existing:
-            raise SmartRoomExceptions(409, "Conflict", "Username already in use.")
-
-        fields_to_update.append("username = %s")
+        columns.append("username")
         params.append(new_username)
 
     # Email
@@ -735,58 +768,35 @@ def admin_update_user(user_id: int):
         if email_error:
             raise SmartRoomExceptions(400, "Bad Request", email_error)
 
-        existing = fetch_one(
-            "SELECT id FROM users WHERE email = %s AND id <> %s",
-            (new_email, user_id),
-        )
-        if existing:
-            raise SmartRoomExceptions(409, "Conflict", "Email already in use.")
-
-        fields_to_update.append("email = %s")
+        columns.append("email")
         params.append(new_email)
 
     # Password
     if "password" in data and data["password"]:
         new_password_hash = hash_password(data["password"])
-        fields_to_update.append("password_hash = %s")
+        columns.append("password_hash")
         params.append(new_password_hash)
 
     # Role
     if "role" in data:
-        new_role = data["role"]
-        if new_role not in ALLOWED_ROLES:
-            raise SmartRoomExceptions(400, "Bad Request", "Invalid role value.")
-        fields_to_update.append("role = %s")
-        params.append(new_role)
+        columns.append("role")
+        params.append(data["role"])
 
-    if not fields_to_update:
+    if not columns:
         raise SmartRoomExceptions(400, "Bad Request", "No valid fields provided to update.")
 
-    set_clause = ", ".join(fields_to_update)
     params.append(user_id)
+    update_sql = _build_update_sql(tuple(columns))
 
-    update_sql = f"""
-    UPDATE users
-       SET {set_clause}
-     WHERE id = %s
-     RETURNING id, first_name, last_name, username, email, role;
-    """
-
-    row = fetch_one(update_sql, tuple(params))
+    # Taken usernames/emails surface as UNIQUE violations from the UPDATE itself
+    try:
+        row = fetch_one(update_sql, tuple(params), prepare=True)
+    except UniqueViolation as e:
+        raise _unique_conflict(e)
     if not row:
         raise SmartRoomExceptions(404, "Not Found", "User not found.")
 
-    user = User(
-        id=row["id"],
-        first_name=row["first_name"],
-        last_name=row["last_name"],
-        username=row["username"],
-        email=row["email"],
-        password_hash="",
-        role=row["role"],
-    )
-
-    return jsonify({"user": user.to_public_dict()}), 200
+    return jsonify({"user": User.public_dict_from_row(row)}), 200
 
 
 # ─────────────────────────────────────────────
@@ -797,6 +807,7 @@ def admin_update_user(user_id: int):
 def admin_delete_user(user_id: int):
     """
     Admin-only endpoint to delete a specific user by ID.
+    Responds 204 with an empty body.
     """
     payload, error = require_auth()
     if error:
@@ -809,7 +820,7 @@ def admin_delete_user(user_id: int):
     if deleted == 0:
         raise SmartRoomExceptions(404, "Not Found", "User not found.")
     
-    return jsonify({"message": "User deleted successfully."}), 200
+    return "", 204
 
 
 # ─────────────────────────────────────────────
@@ -817,5 +828,11 @@ def admin_delete_user(user_id: int):
 # ─────────────────────────────────────────────
 
 if __name__ == "__main__":
-    # For development only; later we'll run via gunicorn or Docker
-    app.run(host="0.0.0.0", port=5001, debug=True)
+    # For development only; the container runs the app under gunicorn (see Dockerfile).
+    # threaded=True so one slow request (password hashing, DB wait) does not
+    # hold up every other client of the dev server.
+    # The Werkzeug debugger can run arbitrary code: opt in with --dev, local-only
+    if "--dev" in sys.argv:
+        app.run(host="127.0.0.1", port=5001, debug=True, threaded=True)
+    else:
+        app.run(host="0.0.0.0", port=5001, threaded=True)
@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from typing import Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class User:
     id: Optional[int]
     first_name: str
@@ -25,3 +25,18 @@ class User:
             "email": self.email,
             "role": self.role,
         }
+
+    @staticmethod
+    def public_dict_from_row(row) -> dict:
+        """
+        Build the to_public_dict() shape straight from a users row,
+        without creating a User object in between.
+        """
+        return {
+            "id": row["id"],
+            "first_name": row["first_name"],
+            "last_name": row["last_name"],
+            "username": row["username"],
+            "email": row["email"],
+            "role": row["role"],
+        }
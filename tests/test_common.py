@@ -0,0 +1,221 @@
+# tests/test_common.py
+
+import io
+import logging
+import threading
+
+import pytest
+from python_http_client.exceptions import HTTPError, UnauthorizedError
+
+import common.async_logging as async_logging
+import common.db as common_db
+import common.email_service as email_service
+from common.async_logging import AsyncBatchHandler
+
+
+# ─────────────────────────────────────────
+# HELPERS
+# ─────────────────────────────────────────
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None, reason="", content=b""):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.reason = reason
+        self.content = content
+
+
+class FakeSession:
+    """
+    Stands in for requests.Session; records every POST.
+    """
+    def __init__(self, response):
+        self.response = response
+        self.calls = []
+
+    def post(self, url, **kwargs):
+        self.calls.append((url, kwargs))
+        return self.response
+
+
+# ─────────────────────────────────────────
+# 1. EMAIL SERVICE
+# ─────────────────────────────────────────
+
+@pytest.fixture
+def sendgrid_env(monkeypatch):
+    monkeypatch.setenv("SENDGRID_API_KEY", "test-key")
+    monkeypatch.setenv("SENDGRID_FROM_EMAIL", "rooms@example.com")
+
+
+def test_send_templated_email_posts_rendered_message(sendgrid_env, monkeypatch):
+    session = FakeSession(FakeResponse(202, headers={"X-Message-Id": "msg-1"}))
+    monkeypatch.setattr(email_service, "_sendgrid_session", lambda: session)
+
+    status_code, message_id = email_service.send_templated_email(
+        to_email="ann@example.com",
+        subject="Signed in",
+        template_name="SignIn.html",
+        context={"first_name": "Ann", "last_name": "Lee", "username": "ann", "email": "ann@example.com"},
+    )
+
+    assert (status_code, message_id) == (202, "msg-1")
+    assert len(session.calls) == 1
+    url, kwargs = session.calls[0]
+    assert url == email_service.SENDGRID_SEND_URL
+    assert kwargs["headers"] == {"Authorization": "Bearer test-key"}
+    assert kwargs["timeout"] == email_service.SENDGRID_TIMEOUT_SECONDS
+
+    payload = kwargs["json"]
+    assert payload["from"] == {"email": "rooms@example.com"}
+    assert payload["subject"] == "Signed in"
+    assert payload["personalizations"][0]["to"] == [{"email": "ann@example.com"}]
+    html = payload["content"][0]["value"]
+    assert "Ann" in html
+    assert "{{first_name}}" not in html
+
+
+def test_send_templated_email_raises_sendgrid_errors(sendgrid_env, monkeypatch):
+    response = FakeResponse(401, reason="Unauthorized", content=b'{"errors": []}')
+    monkeypatch.setattr(email_service, "_sendgrid_session", lambda: FakeSession(response))
+
+    with pytest.raises(UnauthorizedError) as excinfo:
+        email_service.send_templated_email(
+            to_email="ann@example.com", subject="x", template_name="SignIn.html"
+        )
+    assert excinfo.value.status_code == 401
+    assert excinfo.value.body == b'{"errors": []}'
+
+    # codes without a dedicated class still raise the base HTTPError
+    response.status_code = 418
+    with pytest.raises(HTTPError):
+        email_service.send_templated_email(
+            to_email="ann@example.com", subject="x", template_name="SignIn.html"
+        )
+
+
+def test_send_templated_email_requires_configuration(monkeypatch):
+    monkeypatch.delenv("SENDGRID_API_KEY", raising=False)
+    with pytest.raises(email_service.EmailConfigurationError):
+        email_service.send_templated_email(
+            to_email="ann@example.com", subject="x", template_name="SignIn.html"
+        )
+
+
+def test_sendgrid_session_is_per_thread():
+    main_session = email_service._sendgrid_session()
+    assert email_service._sendgrid_session() is main_session
+    assert main_session.headers["User-Agent"].startswith("sendgrid/")
+
+    other = []
+    worker = threading.Thread(target=lambda: other.append(email_service._sendgrid_session()))
+    worker.start()
+    worker.join()
+    assert other[0] is not main_session
+
+
+# ─────────────────────────────────────────
+# 2. ASYNC BATCH LOG HANDLER
+# ─────────────────────────────────────────
+
+@pytest.fixture
+def idle_handler(monkeypatch):
+    """
+    Build AsyncBatchHandlers whose background writer never drains the queue,
+    so tests decide exactly when records are written.
+    """
+    monkeypatch.setattr(AsyncBatchHandler, "_drain_forever", lambda self: None)
+    registered = []
+    monkeypatch.setattr(async_logging.atexit, "register", registered.append)
+
+    def build(**kwargs):
+        stream = io.StringIO()
+        target = logging.StreamHandler(stream)
+        target.setFormatter(logging.Formatter("%(levelname)s %(message)s"))
+        handler = AsyncBatchHandler([target], **kwargs)
+        logger = logging.getLogger(f"test_async_logging.{len(registered)}")
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        logger.addHandler(handler)
+        return logger, handler, stream, registered[-1]
+
+    return build
+
+
+def test_async_handler_flush_writes_queued_records(idle_handler):
+    logger, handler, stream, _ = idle_handler()
+    for n in range(3):
+        logger.info("request %s", n)
+    assert stream.getvalue() == ""
+
+    handler.flush()
+    assert stream.getvalue() == "INFO request 0\nINFO request 1\nINFO request 2\n"
+
+
+def test_async_handler_drops_oldest_records_when_buffer_is_full(idle_handler):
+    logger, handler, stream, _ = idle_handler(max_queue_size=2)
+    for n in range(5):
+        logger.info("request %s", n)
+
+    handler.flush()
+    assert stream.getvalue() == "INFO request 3\nINFO request 4\n"
+
+
+def test_async_handler_writes_in_batches(idle_handler):
+    logger, handler, stream, _ = idle_handler(batch_size=2)
+    for n in range(3):
+        logger.info("request %s", n)
+
+    assert [r.msg for r in handler._next_batch()] == ["request 0", "request 1"]
+    assert [r.msg for r in handler._next_batch()] == ["request 2"]
+    assert handler._next_batch() == []
+
+
+def test_async_handler_flushes_on_close_and_at_exit(idle_handler):
+    logger, handler, stream, at_exit = idle_handler()
+    logger.info("before exit")
+    at_exit()
+    assert stream.getvalue() == "INFO before exit\n"
+
+    logger.info("before close")
+    handler.close()
+    assert stream.getvalue() == "INFO before exit\nINFO before close\n"
+
+
+# ─────────────────────────────────────────
+# 3. SHARED DB POOL / PREPARED STATEMENTS
+# ─────────────────────────────────────────
+
+def test_numbered_placeholders_rewrite():
+    assert common_db._numbered_placeholders(
+        "SELECT id FROM users WHERE username = %s AND email LIKE '%%@example.com' AND id > %s"
+    ) == "SELECT id FROM users WHERE username = $1 AND email LIKE '%@example.com' AND id > $2"
+    # %%s is a literal "%s", not a parameter
+    assert common_db._numbered_placeholders("SELECT '%%s', %s") == "SELECT '%s', $1"
+    assert common_db._numbered_placeholders("SELECT 1") == "SELECT 1"
+
+
+def test_prepared_statement_name_reused_across_pooled_connections():
+    query = "SELECT %s::int + 1, '100%%'"
+
+    with common_db.pooled_connection() as first, common_db.pooled_connection() as second:
+        assert first is not second
+        for conn in (first, second, first):
+            with conn.cursor() as cur:
+                common_db.execute_prepared(cur, query, (41,))
+                assert cur.fetchone() == (42, "100%")
+
+        name = common_db._statement_names[query]
+        # Same name on both connections, each prepared on its own server session
+        for conn in (first, second):
+            assert name in conn.prepared_statements
+            with conn.cursor() as cur:
+                cur.execute("SELECT COUNT(*) FROM pg_prepared_statements WHERE name = %s;", (name,))
+                assert cur.fetchone() == (1,)
+
+
+def test_pooled_connection_autocommit_is_reset():
+    with common_db.pooled_connection(autocommit=True) as conn:
+        assert conn.autocommit
+    with common_db.pooled_connection() as again:
+        assert not again.autocommit
@@ -3,14 +3,17 @@
 import pytest
 
 import services.reviews_service.app as reviews_app
+import services.reviews_service.db as reviews_db
 from services.reviews_service.db import (
     init_reviews_table,
     init_reports_table,
     get_connection,
+    create_review,
 )
 from services.users_service.db import init_users_table
 from services.rooms_service.db import init_rooms_table, create_room
 from common.config import API_VERSION
+from common.security import create_access_token
 
 # --------------------------------------------------------------------------
 # FIXTURES
@@ -261,6 +264,139 @@ def test_fetch_reviews_requires_read_or_admin(client, room_id):
     assert resp2.status_code == 403
 
 
+@pytest.fixture
+def etag_reviewer():
+    """A room and a regular user for the listing ETag tests, removed afterwards."""
+    conn = get_connection()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute("DELETE FROM users WHERE username = 'etaguser';")
+                cur.execute("DELETE FROM rooms WHERE room_name = 'ETag Room';")
+                cur.execute("""
+                    INSERT INTO users (first_name, last_name, username, email, password_hash, role)
+                    VALUES ('E', 'T', 'etaguser', 'etag@example.com', 'x', 'regular')
+                    RETURNING id;
+                """)
+                user_id = cur.fetchone()[0]
+                cur.execute("""
+                    INSERT INTO rooms (room_name, capacity, location)
+                    VALUES ('ETag Room', 4, 'Floor 2')
+                    RETURNING room_id;
+                """)
+                room = cur.fetchone()[0]
+    finally:
+        conn.close()
+
+    yield room, user_id
+
+    conn = get_connection()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute("DELETE FROM reviews WHERE room_id = %s;", (room,))
+                cur.execute("DELETE FROM rooms WHERE room_id = %s;", (room,))
+                cur.execute("DELETE FROM users WHERE id = %s;", (user_id,))
+    finally:
+        conn.close()
+
+
+def test_fetch_reviews_etag_changes_on_edit(client, etag_reviewer):
+    room, user_id = etag_reviewer
+    token = create_access_token(user_id, "regular")
+    review = create_review(room, user_id, 4, "Good")
+
+    resp = client.get(f"{API_VERSION}/reviews/{room}", headers=auth(token))
+    assert resp.status_code == 200
+    etag = resp.headers["ETag"]
+
+    # unchanged listing -> 304
+    resp_same = client.get(
+        f"{API_VERSION}/reviews/{room}",
+        headers={**auth(token), "If-None-Match": etag},
+    )
+    assert resp_same.status_code == 304
+
+    # in-place edit keeps the count and created_at but must change the ETag
+    resp_update = client.put(
+        f"{API_VERSION}/reviews/update/{review['review_id']}",
+        json={"rating": 2, "comment": "Noisy"},
+        headers=auth(token),
+    )
+    assert resp_update.status_code == 200
+
+    resp_edited = client.get(
+        f"{API_VERSION}/reviews/{room}",
+        headers={**auth(token), "If-None-Match": etag},
+    )
+    assert resp_edited.status_code == 200
+    assert resp_edited.headers["ETag"] != etag
+    assert resp_edited.get_json()["reviews"][0]["rating"] == 2
+
+
+def test_fetch_reviews_304_skips_loading_rows(client, etag_reviewer, monkeypatch):
+    room, user_id = etag_reviewer
+    token = create_access_token(user_id, "regular")
+    create_review(room, user_id, 5, "Quiet")
+
+    resp = client.get(f"{API_VERSION}/reviews/{room}", headers=auth(token))
+    etag = resp.headers["ETag"]
+
+    def fail(*args, **kwargs):
+        raise AssertionError("rows fetched for an unchanged listing")
+
+    monkeypatch.setattr(reviews_app, "fetch_review_by_room_id", fail)
+    resp_same = client.get(
+        f"{API_VERSION}/reviews/{room}",
+        headers={**auth(token), "If-None-Match": etag},
+    )
+    assert resp_same.status_code == 304
+    assert resp_same.headers["ETag"] == etag
+
+
+def test_fetch_reviews_etag_changes_when_review_replaced(client, etag_reviewer):
+    room, user_id = etag_reviewer
+    token = create_access_token(user_id, "regular")
+
+    # same count and same latest created_at before and after the swap
+    conn = get_connection()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    INSERT INTO reviews (room_id, user_id, rating, comment, created_at)
+                    VALUES (%s, %s, 5, 'Newest', '2030-01-02'),
+                           (%s, %s, 3, 'Older', '2030-01-01')
+                    RETURNING review_id;
+                """, (room, user_id, room, user_id))
+                older_id = cur.fetchall()[1][0]
+    finally:
+        conn.close()
+
+    resp = client.get(f"{API_VERSION}/reviews/{room}", headers=auth(token))
+    etag = resp.headers["ETag"]
+
+    conn = get_connection()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute("DELETE FROM reviews WHERE review_id = %s;", (older_id,))
+                cur.execute("""
+                    INSERT INTO reviews (room_id, user_id, rating, comment, created_at)
+                    VALUES (%s, %s, 1, 'Replacement', '2030-01-01');
+                """, (room, user_id))
+    finally:
+        conn.close()
+
+    resp_after = client.get(
+        f"{API_VERSION}/reviews/{room}",
+        headers={**auth(token), "If-None-Match": etag},
+    )
+    assert resp_after.status_code == 200
+    assert resp_after.headers["ETag"] != etag
+    assert {r["comment"] for r in resp_after.get_json()["reviews"]} == {"Newest", "Replacement"}
+
+
 # --------------------------------------------------------------------------
 # 5. REPORT REVIEW
 # --------------------------------------------------------------------------
@@ -438,3 +574,45 @@ def test_ops_logs_admin_only(client):
         headers=auth(t_user)
     )
     assert resp_fail.status_code == 403
+
+
+# --------------------------------------------------------------------------
+# 10. SCHEMA INIT
+# --------------------------------------------------------------------------
+
+def test_init_schema_runs_ddl_once_per_version(monkeypatch):
+    probe_sql = "CREATE TABLE IF NOT EXISTS schema_probe_reviews (n INT); INSERT INTO schema_probe_reviews VALUES (1);"
+
+    def probe_state():
+        conn = get_connection()
+        try:
+            with conn:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT COUNT(*) FROM schema_probe_reviews;")
+                    rows = cur.fetchone()[0]
+                    cur.execute("SELECT value FROM schema_meta WHERE key = %s;", (reviews_db.REVIEWS_SCHEMA_KEY,))
+                    return rows, cur.fetchone()[0]
+        finally:
+            conn.close()
+
+    # Stand-in DDL that leaves a row behind every time it runs
+    monkeypatch.setattr(reviews_db, "CREATE_REVIEWS_TABLE_SQL", probe_sql)
+    monkeypatch.setattr(reviews_db, "REVIEWS_SCHEMA_VERSION", "test-bump")
+    try:
+        reviews_db.init_schema()
+        assert probe_state() == (1, "test-bump")
+
+        # Same version: the second call skips the DDL
+        reviews_db.init_schema()
+        assert probe_state() == (1, "test-bump")
+    finally:
+        monkeypatch.undo()
+        # Back to the real version, which re-applies the real DDL once
+        reviews_db.init_schema()
+        conn = get_connection()
+        try:
+            with conn:
+                with conn.cursor() as cur:
+                    cur.execute("DROP TABLE IF EXISTS schema_probe_reviews;")
+        finally:
+            conn.close()
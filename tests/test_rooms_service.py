@@ -1,9 +1,17 @@
 # tests/test_rooms_service.py
 
-import pytest
+import select
+import threading
+import time
 from datetime import datetime
+from types import SimpleNamespace
+
+import psycopg2
+import pytest
 
 import services.rooms_service.app as rooms_app
+import services.rooms_service.db as rooms_db
+import common.db as common_db
 from services.rooms_service.db import (
     init_rooms_table,
     init_equipment_table,
@@ -11,6 +19,10 @@ from services.rooms_service.db import (
     get_connection,
     create_room,
     fetch_room,
+    set_room_equipment,
+    fetch_equipment_for_room,
+    fetch_rooms_generation,
+    notify_rooms_changed,
 )
 from services.users_service.db import init_users_table
 from services.bookings_service.db import init_bookings_table
@@ -290,6 +302,58 @@ def test_get_room_status_forbidden_for_non_readonly(client):
     assert resp.status_code == 403
 
 
+def test_get_room_status_if_none_match_returns_304(client):
+    room_id = create_test_room(name="StatusEtag")
+    headers = make_auth_header(user_id=9, role="auditor")
+
+    resp = client.get(f"{API_VERSION}/rooms/{room_id}/status", headers=headers)
+    assert resp.status_code == 200
+    etag = resp.headers["ETag"]
+    assert not etag.startswith("W/")
+
+    # Served from the status cache
+    resp = client.get(f"{API_VERSION}/rooms/{room_id}/status", headers={**headers, "If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.headers["ETag"] == etag
+
+    # Recomputed from the DB: same body, so still the same ETag
+    rooms_app._room_status_cache.clear()
+    resp = client.get(f"{API_VERSION}/rooms/{room_id}/status", headers={**headers, "If-None-Match": etag})
+    assert resp.status_code == 304
+
+
+def test_room_status_ttl_rolls_over_at_midnight():
+    end_of_day = datetime.combine(datetime(2026, 3, 1).date(), datetime.max.time())
+
+    midday = datetime(2026, 3, 1, 12, 0)
+    assert rooms_app._room_status_ttl(midday, end_of_day, True) == rooms_app.STATUS_CACHE_TTL_SECONDS
+    assert rooms_app._room_status_ttl(midday, end_of_day, False) == rooms_app.CACHE_TTL_SECONDS
+
+    # Just before midnight the entry only lives until the day changes
+    assert rooms_app._room_status_ttl(datetime(2026, 3, 1, 23, 59, 50), end_of_day, False) == 9
+    assert rooms_app._room_status_ttl(datetime(2026, 3, 2, 0, 0, 1), end_of_day, False) == 0
+
+
+def test_get_room_status_near_midnight_expires_at_midnight(client, monkeypatch):
+    class LateDatetime:
+        # Plain datetimes come out of it, so the JSON provider still encodes them
+        combine = staticmethod(datetime.combine)
+        min, max = datetime.min, datetime.max
+
+        @staticmethod
+        def now():
+            return datetime(2026, 3, 1, 23, 59, 57)
+
+    monkeypatch.setattr(rooms_app, "datetime", LateDatetime)
+    room_id = create_test_room(name="LateRoom")
+    headers = make_auth_header(user_id=9, role="auditor")
+
+    resp = client.get(f"{API_VERSION}/rooms/{room_id}/status", headers=headers)
+    assert resp.status_code == 200
+    assert resp.cache_control.max_age == 2
+    assert rooms_app._room_status_cache[room_id]["max_age"] == 2
+
+
 # ─────────────────────────────────────────
 # 7. TOGGLE ROOM AVAILABILITY
 # ─────────────────────────────────────────
@@ -386,3 +450,347 @@ def test_ops_logs_admin_only(client):
     # Regular user should be forbidden
     resp_forbidden = client.get(f"{API_VERSION}/ops/logs", headers=user_headers)
     assert resp_forbidden.status_code == 403
+
+
+# ─────────────────────────────────────────
+# 10. ROOM EQUIPMENT
+# ─────────────────────────────────────────
+
+def run_sql(sql, params=None):
+    conn = get_connection()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute(sql, params)
+    finally:
+        conn.close()
+
+
+def test_set_room_equipment_resolves_names_after_rename_and_delete():
+    room_a = create_test_room(name="EqA")
+    room_b = create_test_room(name="EqB")
+
+    set_room_equipment(room_a, [{"name": "Projector", "quantity": 1}])
+    [projector] = fetch_equipment_for_room(room_a)
+
+    # Renamed outside the service: "Projector" must no longer map to the old id
+    run_sql("UPDATE equipment SET equipment_name = 'Old Projector' WHERE equipment_id = %s", (projector["equipment_id"],))
+    set_room_equipment(room_b, [{"name": "Projector", "quantity": 2}])
+    [attached] = fetch_equipment_for_room(room_b)
+    assert attached["equipment_name"] == "Projector"
+    assert attached["equipment_id"] != projector["equipment_id"]
+    assert attached["quantity"] == 2
+
+    # Deleted outside the service: the name is created again instead of failing on a stale id
+    run_sql("DELETE FROM room_equipment WHERE equipment_id = %s", (attached["equipment_id"],))
+    run_sql("DELETE FROM equipment WHERE equipment_id = %s", (attached["equipment_id"],))
+    set_room_equipment(room_b, [{"name": "Projector", "quantity": 3}])
+    [recreated] = fetch_equipment_for_room(room_b)
+    assert recreated["equipment_name"] == "Projector"
+    assert recreated["quantity"] == 3
+
+
+# ─────────────────────────────────────────
+# 11. ROOMS ETAGS
+# ─────────────────────────────────────────
+
+def test_get_all_rooms_if_none_match_returns_304(client):
+    create_test_room(name="Cached")
+
+    resp = client.get(f"{API_VERSION}/rooms")
+    assert resp.status_code == 200
+    etag = resp.headers["ETag"]
+
+    resp = client.get(f"{API_VERSION}/rooms", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.headers["ETag"] == etag
+    assert resp.get_data() == b""
+
+
+def test_get_room_by_id_if_none_match_returns_304(client):
+    room_id = create_test_room(name="CachedOne")
+    headers = make_auth_header(user_id=3, role="regular")
+
+    resp = client.get(f"{API_VERSION}/rooms/{room_id}", headers=headers)
+    assert resp.status_code == 200
+    etag = resp.headers["ETag"]
+
+    resp = client.get(f"{API_VERSION}/rooms/{room_id}", headers={**headers, "If-None-Match": etag})
+    assert resp.status_code == 304
+
+
+def test_room_writes_change_etag(client):
+    create_test_room(name="Base")
+    headers = make_auth_header(user_id=1, role="admin")
+
+    def current_etag():
+        return client.get(f"{API_VERSION}/rooms").headers["ETag"]
+
+    etags = [current_etag()]
+
+    resp = client.post(
+        f"{API_VERSION}/rooms",
+        json={"name": "EtagRoom", "capacity": 4, "location": "L1", "equipment": [{"name": "TV", "quantity": 1}]},
+        headers=headers,
+    )
+    assert resp.status_code == 201
+    room_id = resp.get_json()["details"]["room"]["room_id"]
+    etags.append(current_etag())
+
+    resp = client.put(f"{API_VERSION}/rooms/update/EtagRoom", json={"capacity": 6}, headers=headers)
+    assert resp.status_code == 200
+    etags.append(current_etag())
+
+    resp = client.delete(f"{API_VERSION}/rooms/{room_id}", headers=headers)
+    assert resp.status_code == 200
+    etags.append(current_etag())
+
+    assert len(set(etags)) == 4
+    # A client holding the pre-write ETag gets the new body, not a 304
+    resp = client.get(f"{API_VERSION}/rooms", headers={"If-None-Match": etags[0]})
+    assert resp.status_code == 200
+
+
+def test_rooms_etag_follows_shared_generation(client):
+    create_test_room(name="Base")
+    # Another worker's write: it advances the DB generation and notifies us
+    generation = notify_rooms_changed()
+    rooms_app._drop_local_room_cache(None, generation)
+    assert fetch_rooms_generation() == generation
+
+    resp = client.get(f"{API_VERSION}/rooms")
+    assert resp.headers["ETag"] == f'W/"rooms-{generation}"'
+
+    # A late or echoed notification never moves the version backwards
+    rooms_app._drop_local_room_cache(None, generation - 1)
+    resp = client.get(f"{API_VERSION}/rooms")
+    assert resp.headers["ETag"] == f'W/"rooms-{generation}"'
+
+
+# ─────────────────────────────────────────
+# 12. CACHE INVALIDATION LISTENER
+# ─────────────────────────────────────────
+
+class StopListening(BaseException):
+    """
+    Raised by the fakes to leave listen_for_room_changes' endless loop.
+    A BaseException, so the listener's catch-all does not swallow it.
+    """
+
+
+class FakeListenCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.conn.executed.append(sql)
+
+    def fetchone(self):
+        return (self.conn.generation,)
+
+
+class FakeListenConnection:
+    """
+    Stands in for the listener's psycopg2 connection: delivers payloads on poll(),
+    or fails like a dropped connection when drop is set.
+    """
+    def __init__(self, generation, payloads=(), drop=False):
+        self.autocommit = False
+        self.generation = generation
+        self.pending = list(payloads)
+        self.drop = drop
+        self.notifies = []
+        self.executed = []
+        self.closed = False
+
+    def cursor(self):
+        return FakeListenCursor(self)
+
+    def poll(self):
+        if self.drop:
+            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+        self.notifies.extend(SimpleNamespace(payload=p) for p in self.pending)
+        self.pending = []
+
+    def close(self):
+        self.closed = True
+
+
+def fake_select(rlist, wlist, xlist, timeout):
+    conn = rlist[0]
+    if conn.pending or conn.drop:
+        return rlist, [], []
+    raise StopListening
+
+
+def patch_for_this_thread(monkeypatch, target, name, fake):
+    """
+    The app's own listener thread runs the same module code; only this thread sees the fake.
+    """
+    real = getattr(target, name)
+    owner = threading.current_thread()
+    monkeypatch.setattr(
+        target, name,
+        lambda *args, **kwargs: (fake if threading.current_thread() is owner else real)(*args, **kwargs),
+    )
+
+
+def test_listener_notifications_clear_caches(monkeypatch):
+    generation = rooms_app._rooms_version
+    conn = FakeListenConnection(generation, payloads=[f"{generation + 1}:5", f"{generation + 2}:"])
+    patch_for_this_thread(monkeypatch, rooms_db, "get_connection", lambda: conn)
+    patch_for_this_thread(monkeypatch, select, "select", fake_select)
+
+    rooms_app._rooms_cache_all.update(body=b"{}", version=generation, expires_at=time.monotonic() + 60)
+    rooms_app._room_cache_by_id[5] = {"body": b"{}", "version": generation, "expires_at": time.monotonic() + 60}
+    rooms_app._room_status_cache[5] = {"body": b"{}", "etag": "x", "max_age": 60,
+                                       "generation": rooms_app._status_generation,
+                                       "expires_at": time.monotonic() + 60}
+    status_generation = rooms_app._status_generation
+
+    calls = []
+
+    def on_change(room_id, new_generation):
+        calls.append((room_id, new_generation))
+        rooms_app._drop_local_room_cache(room_id, new_generation)
+
+    with pytest.raises(StopListening):
+        rooms_db.listen_for_room_changes(on_change, poll_seconds=0)
+
+    assert conn.autocommit is True
+    assert f"LISTEN {rooms_db.ROOMS_INVALIDATE_CHANNEL};" in conn.executed
+    assert calls == [(None, generation), (5, generation + 1), (None, generation + 2)]
+    assert conn.closed
+    assert rooms_app._rooms_version == generation + 2
+    assert rooms_app._rooms_cache_all["body"] is None
+    assert 5 not in rooms_app._room_cache_by_id
+    assert 5 not in rooms_app._room_status_cache
+    assert rooms_app._status_generation > status_generation
+
+
+def test_listener_reconnects_after_dropped_connection(monkeypatch):
+    dropped = FakeListenConnection(7, drop=True)
+    healthy = FakeListenConnection(8, payloads=["9:3"])
+    attempts = iter([psycopg2.OperationalError("could not connect"), dropped, healthy])
+
+    def connect():
+        result = next(attempts)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    sleeps = []
+    logged = []
+    monkeypatch.setattr(rooms_db.logger, "exception", lambda msg, *args: logged.append(msg % args))
+    patch_for_this_thread(monkeypatch, rooms_db, "get_connection", connect)
+    patch_for_this_thread(monkeypatch, select, "select", fake_select)
+    patch_for_this_thread(monkeypatch, time, "sleep", sleeps.append)
+
+    calls = []
+    with pytest.raises(StopListening):
+        rooms_db.listen_for_room_changes(lambda *args: calls.append(args), poll_seconds=0.25)
+
+    # Backs off after the failed connect and after the drop, then resyncs on each reconnect
+    assert sleeps == [0.25, 0.25]
+    assert len(logged) == 2
+    assert dropped.closed and healthy.closed
+    assert calls == [(None, 7), (None, 8), (3, 9)]
+
+
+def test_listener_survives_non_database_errors(monkeypatch):
+    # A malformed payload, then an on_change that blows up, then a healthy connection
+    malformed = FakeListenConnection(1, payloads=["not-a-generation:"])
+    failing = FakeListenConnection(2, payloads=["3:4"])
+    healthy = FakeListenConnection(5, payloads=["6:7"])
+    connections = iter([malformed, failing, healthy])
+
+    logged = []
+    monkeypatch.setattr(rooms_db.logger, "exception", lambda msg, *args: logged.append(msg % args))
+    patch_for_this_thread(monkeypatch, rooms_db, "get_connection", lambda: next(connections))
+    patch_for_this_thread(monkeypatch, select, "select", fake_select)
+    patch_for_this_thread(monkeypatch, time, "sleep", lambda seconds: None)
+
+    calls = []
+
+    def on_change(room_id, generation):
+        calls.append((room_id, generation))
+        if room_id == 4:
+            raise RuntimeError("cache drop failed")
+
+    with pytest.raises(StopListening):
+        rooms_db.listen_for_room_changes(on_change, poll_seconds=0)
+
+    assert calls == [(None, 1), (None, 2), (4, 3), (None, 5), (7, 6)]
+    assert len(logged) == 2
+    assert malformed.closed and failing.closed
+
+
+# ─────────────────────────────────────────
+# 13. SCHEMA INIT
+# ─────────────────────────────────────────
+
+def test_init_schema_runs_ddl_once_per_version(monkeypatch):
+    probe_sql = "CREATE TABLE IF NOT EXISTS schema_probe_rooms (n INT); INSERT INTO schema_probe_rooms VALUES (1);"
+
+    def probe_state():
+        conn = get_connection()
+        try:
+            with conn:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT COUNT(*) FROM schema_probe_rooms;")
+                    rows = cur.fetchone()[0]
+                    cur.execute("SELECT value FROM schema_meta WHERE key = %s;", (rooms_db.ROOMS_SCHEMA_KEY,))
+                    return rows, cur.fetchone()[0]
+        finally:
+            conn.close()
+
+    # Stand-in DDL that leaves a row behind every time it runs
+    monkeypatch.setattr(rooms_db, "CREATE_ROOMS_TABLE_SQL", probe_sql)
+    monkeypatch.setattr(rooms_db, "ROOMS_SCHEMA_VERSION", "test-bump")
+    try:
+        rooms_db.init_schema()
+        assert probe_state() == (1, "test-bump")
+
+        # Same version: the second call skips the DDL
+        rooms_db.init_schema()
+        assert probe_state() == (1, "test-bump")
+    finally:
+        monkeypatch.undo()
+        # Back to the real version, which re-applies the real DDL once
+        rooms_db.init_schema()
+        conn = get_connection()
+        try:
+            with conn:
+                with conn.cursor() as cur:
+                    cur.execute("DROP TABLE IF EXISTS schema_probe_rooms;")
+        finally:
+            conn.close()
+
+
+# ─────────────────────────────────────────
+# 14. PREPARED STATEMENTS
+# ─────────────────────────────────────────
+
+def test_prepared_statement_reused_across_pooled_connections():
+    room_id = create_test_room(name="Prepared")
+
+    with rooms_db.pooled_connection() as first, rooms_db.pooled_connection() as second:
+        assert first is not second
+        for conn in (first, second, first):
+            with conn.cursor() as cur:
+                rooms_db._execute_prepared(cur, "fetch_room", (room_id,))
+                assert cur.fetchone()[0] == room_id
+
+        # Each connection prepared "fetch_room" once on its own server session
+        name = common_db._statement_names[rooms_db._PREPARED_SQL["fetch_room"]]
+        for conn in (first, second):
+            assert name in conn.prepared_statements
+            with conn.cursor() as cur:
+                cur.execute("SELECT COUNT(*) FROM pg_prepared_statements WHERE name = %s;", (name,))
+                assert cur.fetchone() == (1,)
@@ -4,8 +4,10 @@ import hashlib
 from datetime import datetime, timedelta
 
 import pytest
+from werkzeug.security import generate_password_hash
 
 import services.users_service.app as users_app
+import services.users_service.db as users_db
 from services.users_service.db import (
     init_users_table,
     get_connection,
@@ -13,6 +15,7 @@ from services.users_service.db import (
     create_reset_token,
 )
 from common.config import API_VERSION
+from common.security import PASSWORD_HASH_METHOD
 
 
 # ─────────────────────────────────────────
@@ -173,6 +176,104 @@ def test_login_invalid_credentials(client):
     assert resp2.status_code == 401
 
 
+def test_login_unknown_user_checks_dummy_hash(client, monkeypatch):
+    checked = []
+    real_verify = users_app.verify_password
+
+    def spy_verify(password, password_hash):
+        checked.append((password, password_hash))
+        return real_verify(password, password_hash)
+
+    monkeypatch.setattr(users_app, "verify_password", spy_verify)
+
+    resp, _ = login_user(client, "nobody", password="Guess123!")
+    assert resp.status_code == 401
+    # the miss pays for the same password-hash work as a wrong password
+    assert checked == [("Guess123!", users_app._DUMMY_PASSWORD_HASH)]
+    assert users_app._DUMMY_PASSWORD_HASH.startswith(PASSWORD_HASH_METHOD + "$")
+
+
+def test_login_right_after_failed_lookup(client):
+    # a username that was probed before it existed must work as soon as it is registered
+    resp, _ = login_user(client, "frank")
+    assert resp.status_code == 401
+
+    register_user(client, "adminuser", "admin@example.com", role="admin")
+    _, admin_token = login_user(client, "adminuser")
+    resp_lookup = client.get(f"{API_VERSION}/users/frank", headers=auth_headers(admin_token))
+    assert resp_lookup.status_code == 404
+
+    assert register_user(client, "frank", "frank@example.com").status_code == 201
+
+    resp, token = login_user(client, "frank")
+    assert resp.status_code == 200
+    assert token is not None
+
+    resp_lookup = client.get(f"{API_VERSION}/users/frank", headers=auth_headers(admin_token))
+    assert resp_lookup.status_code == 200
+
+
+def test_login_repeated_unknown_user_is_not_short_circuited(client, monkeypatch):
+    lookups = []
+    checked_hashes = []
+    real_fetch_one = users_app.fetch_one
+    real_verify = users_app.verify_password
+
+    def spy_fetch_one(query, params=None, prepare=False):
+        lookups.append(params)
+        return real_fetch_one(query, params, prepare=prepare)
+
+    def spy_verify(password, password_hash):
+        checked_hashes.append(password_hash)
+        return real_verify(password, password_hash)
+
+    monkeypatch.setattr(users_app, "fetch_one", spy_fetch_one)
+    monkeypatch.setattr(users_app, "verify_password", spy_verify)
+
+    for _ in range(2):
+        resp, _ = login_user(client, "ghost", password="whatever")
+        assert resp.status_code == 401
+
+    # every probe reads the DB and pays for a password check
+    assert lookups == [("ghost",), ("ghost",)]
+    assert checked_hashes == [users_app._DUMMY_PASSWORD_HASH] * 2
+
+
+def test_login_rehashes_password_with_old_scrypt_parameters(client):
+    register_user(client, "hank", "hank@example.com")
+    old_hash = generate_password_hash("StrongPass123!", method="scrypt:16384:8:1")
+    conn = get_connection()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute("UPDATE users SET password_hash = %s WHERE username = 'hank';", (old_hash,))
+    finally:
+        conn.close()
+
+    resp, _ = login_user(client, "hank")
+    assert resp.status_code == 200
+
+    new_hash = fetch_one("SELECT password_hash FROM users WHERE username = %s", ("hank",))["password_hash"]
+    assert new_hash != old_hash
+    assert new_hash.startswith(PASSWORD_HASH_METHOD + "$")
+
+    # the upgraded hash still accepts the password
+    resp, _ = login_user(client, "hank")
+    assert resp.status_code == 200
+
+
+def test_login_keeps_current_password_hash(client):
+    register_user(client, "iris", "iris@example.com")
+    stored = fetch_one("SELECT password_hash FROM users WHERE username = %s", ("iris",))["password_hash"]
+    assert stored.startswith(PASSWORD_HASH_METHOD + "$")
+
+    resp, _ = login_user(client, "iris")
+    assert resp.status_code == 200
+
+    after_login = fetch_one("SELECT password_hash FROM users WHERE username = %s", ("iris",))["password_hash"]
+    assert after_login == stored
+
+
 def test_login_missing_fields(client):
     resp = client.post(f"{API_VERSION}/auth/login", json={"username": "x"})
     assert resp.status_code == 400
@@ -335,7 +436,7 @@ def test_delete_my_account(client):
         f"{API_VERSION}/users/me",
         headers=auth_headers(token),
     )
-    assert resp.status_code == 200
+    assert resp.status_code == 204
 
     # After deletion, login should fail
     resp_login = client.post(
@@ -377,6 +478,47 @@ def test_get_all_users_admin_only(client):
     assert resp2.status_code == 403
 
 
+def test_get_all_users_pagination(client):
+    register_user(client, "adminuser", "admin@example.com", role="admin")
+    _, admin_token = login_user(client, "adminuser")
+    for name in ("pam", "quinn", "ray", "sue"):
+        register_user(client, name, f"{name}@example.com")
+
+    # first page
+    resp = client.get(f"{API_VERSION}/users?limit=2", headers=auth_headers(admin_token))
+    assert resp.status_code == 200
+    page1 = resp.get_json()
+    assert [u["username"] for u in page1["users"]] == ["adminuser", "pam"]
+    assert page1["next_cursor"] == page1["users"][-1]["id"]
+
+    # follow the cursor
+    resp = client.get(
+        f"{API_VERSION}/users?limit=2&after={page1['next_cursor']}",
+        headers=auth_headers(admin_token),
+    )
+    page2 = resp.get_json()
+    assert [u["username"] for u in page2["users"]] == ["quinn", "ray"]
+    assert page2["next_cursor"] == page2["users"][-1]["id"]
+
+    # last (short) page has no cursor
+    resp = client.get(
+        f"{API_VERSION}/users?limit=2&after={page2['next_cursor']}",
+        headers=auth_headers(admin_token),
+    )
+    page3 = resp.get_json()
+    assert [u["username"] for u in page3["users"]] == ["sue"]
+    assert page3["next_cursor"] is None
+
+
+def test_get_all_users_rejects_bad_paging_params(client):
+    register_user(client, "adminuser", "admin@example.com", role="admin")
+    _, admin_token = login_user(client, "adminuser")
+
+    for query in ("limit=abc", "limit=0", "limit=501", "after=x", "after=-1"):
+        resp = client.get(f"{API_VERSION}/users?{query}", headers=auth_headers(admin_token))
+        assert resp.status_code == 400, query
+
+
 def test_get_user_by_username_permissions(client):
     # create admin and two regular users
     register_user(client, "adminuser", "admin@example.com", role="admin")
@@ -453,7 +595,7 @@ def test_admin_delete_user(client):
         f"{API_VERSION}/users/{user_id}",
         headers=auth_headers(admin_token),
     )
-    assert resp.status_code == 200
+    assert resp.status_code == 204
 
     # user should be gone
     row_after = fetch_one(
@@ -489,3 +631,62 @@ def test_get_service_logs_admin_only(client):
         headers=auth_headers(sam_token),
     )
     assert resp2.status_code == 403
+
+
+# ─────────────────────────────────────────
+# 7. SCHEMA INIT
+# ─────────────────────────────────────────
+
+def test_init_schema_runs_ddl_once_per_version(monkeypatch):
+    probe_sql = "CREATE TABLE IF NOT EXISTS schema_probe_users (n INT); INSERT INTO schema_probe_users VALUES (1);"
+
+    def probe_state():
+        conn = get_connection()
+        try:
+            with conn:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT COUNT(*) FROM schema_probe_users;")
+                    rows = cur.fetchone()[0]
+                    cur.execute("SELECT value FROM schema_meta WHERE key = %s;", (users_db.USERS_SCHEMA_KEY,))
+                    return rows, cur.fetchone()[0]
+        finally:
+            conn.close()
+
+    # Stand-in DDL that leaves a row behind every time it runs
+    monkeypatch.setattr(users_db, "CREATE_USERS_TABLES_SQL", probe_sql)
+    monkeypatch.setattr(users_db, "USERS_SCHEMA_VERSION", "test-bump")
+    try:
+        users_db.init_schema()
+        assert probe_state() == (1, "test-bump")
+
+        # Same version: the second call skips the DDL
+        users_db.init_schema()
+        assert probe_state() == (1, "test-bump")
+    finally:
+        monkeypatch.undo()
+        # Back to the real version, which re-applies the real DDL once
+        users_db.init_schema()
+        conn = get_connection()
+        try:
+            with conn:
+                with conn.cursor() as cur:
+                    cur.execute("DROP TABLE IF EXISTS schema_probe_users;")
+        finally:
+            conn.close()
+
+
+# ─────────────────────────────────────────
+# 8. PREPARED STATEMENTS
+# ─────────────────────────────────────────
+
+def test_fetch_one_prepared_with_literal_percent(client):
+    register_user(client, "percy", "percy@example.com")
+
+    query = "SELECT username, '100%%' AS share FROM users WHERE username = %s"
+    expected = {"username": "percy", "share": "100%"}
+    assert fetch_one(query, ("percy",), prepare=True) == expected
+    # Unprepared and prepared runs read %% the same way
+    assert fetch_one(query, ("percy",)) == expected
+    # Second prepared run reuses the statement prepared above
+    assert fetch_one(query, ("percy",), prepare=True) == expected
+